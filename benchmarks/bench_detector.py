@@ -0,0 +1,77 @@
+"""Time and peak memory of ManipulationDetector.detect_all on a large frame.
+
+Peak memory is measured with tracemalloc (NumPy and pandas buffers are
+traced) and reported next to the input frame size, so the cost of copies
+and repeated metric conversions shows up directly.
+
+With --compact the frame first goes through the standardization dtype
+policy (unsigned counts, Arrow strings), as uploads and sample data do.
+
+With --single-creator the posts have no author column, like a creator's
+own analytics export with day-only dates; the run fails if any of them is flagged as
+coordinated, since one account cannot coordinate with itself.
+
+Usage: python benchmarks/bench_detector.py [n_rows] [--titles] [--compact] [--single-creator]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing.dtypes import apply_dtype_policy
+from src.models.manipulation_detector import ManipulationDetector
+
+
+def make_posts(n, titles=False, seed=0):
+    rng = np.random.default_rng(seed)
+    views = rng.lognormal(8, 1.5, n).round()
+    df = pd.DataFrame({
+        "post_id": np.arange(n),
+        "date": pd.Timestamp("2024-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit="s"),
+        "author": rng.integers(0, n // 50 + 1, n),
+        "views": views,
+        "likes": (views * rng.beta(2, 40, n)).round(),
+        "comments": (views * rng.beta(1, 400, n)).round(),
+        "shares": (views * rng.beta(1, 800, n)).round(),
+    })
+    if titles:
+        df["title"] = "post " + pd.Series(rng.integers(0, n, n)).astype(str)
+    return df
+
+
+def main(n, titles=False, compact=False, single_creator=False):
+    df = make_posts(n, titles)
+    if single_creator:
+        # Exports often carry day-only dates, which puts many posts in one burst window
+        df = df.drop(columns="author").assign(date=df["date"].dt.floor("D"))
+    if compact:
+        df = apply_dtype_policy(df)
+    frame_mb = df.memory_usage(deep=True).sum() / 1e6
+    detector = ManipulationDetector()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    results, summary = detector.detect_all(df)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"rows:       {n:,}")
+    print(f"input:      {frame_mb:,.0f} MB")
+    print(f"elapsed:    {elapsed:.2f}s ({n / elapsed:,.0f} rows/s)")
+    print(f"peak alloc: {peak / 1e6:,.0f} MB ({peak / 1e6 / frame_mb:.2f}x input)")
+    print(f"flagged:    {summary['total_flagged']:,}")
+    print(f"rule hits:  {detector.last_rule_hits}")
+    if single_creator and summary["coordination_anomalies"]:
+        sys.exit(f"{summary['coordination_anomalies']:,} single-creator posts flagged as coordinated")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    main(int(args[0]) if args else 5_000_000, titles="--titles" in sys.argv, compact="--compact" in sys.argv,
+         single_creator="--single-creator" in sys.argv)
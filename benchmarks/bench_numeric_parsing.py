@@ -0,0 +1,53 @@
+"""Throughput check for parse_numeric on mixed-format export values.
+
+Usage: python benchmarks/bench_numeric_parsing.py [n_values]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing.numeric import parse_numeric
+
+
+def make_values(n, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 5_000_000, n)
+    fmt = rng.integers(0, 6, n)
+    plain = base.astype(str)
+    us = pd.Series(base).map("{:,}".format).to_numpy()
+    eu = pd.Series(base).map("{:,}".format).str.replace(",", ".").to_numpy()
+    kilo = pd.Series(base / 1_000).map("{:.1f}K".format).to_numpy()
+    mega = pd.Series(base / 1_000_000).map("{:.2f}".format).str.replace(".", ",").add(" M").to_numpy()
+    values = np.select([fmt == 0, fmt == 1, fmt == 2, fmt == 3, fmt == 4], [plain, us, eu, kilo, mega], "—")
+
+    expected = base.astype("float64")
+    expected[fmt == 3] = pd.to_numeric(pd.Series(kilo[fmt == 3]).str[:-1]).to_numpy() * 1_000
+    expected[fmt == 4] = pd.to_numeric(pd.Series(mega[fmt == 4]).str[:-2].str.replace(",", ".")).to_numpy() * 1_000_000
+    expected[fmt == 5] = np.nan
+    # "1.234" style values with a single dot are read as decimals, not thousands.
+    single_dot = (fmt == 2) & (base >= 1_000) & (base < 1_000_000)
+    expected[single_dot] = base[single_dot] / 1_000
+    return pd.Series(values, dtype=object), expected
+
+
+def main(n):
+    values, expected = make_values(n)
+    start = time.perf_counter()
+    parsed, stats = parse_numeric(values)
+    elapsed = time.perf_counter() - start
+
+    both_nan = np.isnan(parsed) & np.isnan(expected)
+    correct = both_nan | np.isclose(parsed, expected, rtol=1e-9)
+    print(f"values:     {n:,}")
+    print(f"elapsed:    {elapsed:.2f}s ({n / elapsed:,.0f} values/s)")
+    print(f"coverage:   {stats['coverage']:.4f} ({stats['parsed']:,} / {stats['non_empty']:,})")
+    print(f"correct:    {correct.mean():.4%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,40 @@
+"""Rule evaluation throughput versus worker count.
+
+Runs ParallelRuleExecutor on the same frame for each worker count and
+checks the flags against the single-process result.
+
+Usage: python benchmarks/bench_parallel.py [n_rows] [workers,...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_detector import make_posts
+from src.models.parallel import ParallelRuleExecutor
+from src.models.rules import RulesEngine
+
+
+def main(n, workers):
+    df = make_posts(n)
+    rules = RulesEngine()
+    start = time.perf_counter()
+    baseline = rules.evaluate(df)
+    serial = time.perf_counter() - start
+    print(f"rows:       {n:,} ({os.cpu_count()} CPUs)")
+    print(f"serial:     {serial:.2f}s")
+    for w in workers:
+        start = time.perf_counter()
+        result = ParallelRuleExecutor(rules, n_workers=w).evaluate(df)
+        elapsed = time.perf_counter() - start
+        same = np.array_equal(result.flags, baseline.flags)
+        print(f"{w:>3} workers: {elapsed:.2f}s ({serial / elapsed:.2f}x) identical={same}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    workers = [int(w) for w in sys.argv[2].split(",")] if len(sys.argv) > 2 else [2, 4, 8, 16, 32]
+    main(n, workers)
@@ -0,0 +1,73 @@
+"""Resident memory of many dashboard sessions holding the same dataset.
+
+Each simulated session either keeps its own copy of the standardized
+frame (as ``st.session_state["df"]`` did) or a view opened from the shared
+memory-mapped dataset store. Every column is read once so that mapped
+pages are actually resident. Private (anonymous) memory growth per session
+is what each additional analyst costs; mapped file pages live once in the
+shared page cache, whatever the number of sessions or processes.
+
+Usage: python benchmarks/bench_sessions.py [n_rows] [sessions]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing.schema import generate_sample_data
+from src.data_processing.store import DatasetStore
+
+
+def private_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1e3
+    return 0.0
+
+
+def touch(df):
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            values.sum()
+        else:
+            values.isna().sum()
+
+
+def run(label, sessions, load):
+    gc.collect()
+    base = private_mb()
+    start = time.perf_counter()
+    held = []
+    for _ in range(sessions):
+        df = load()
+        touch(df)
+        held.append(df)
+    elapsed = time.perf_counter() - start
+    grown = private_mb() - base
+    print(f"{label:<8} {sessions} sessions: +{grown:,.0f} MB private ({grown / sessions:,.1f} MB/session), "
+          f"{elapsed / sessions * 1e3:,.0f} ms to open")
+    del held
+
+
+def main(n, sessions):
+    df = generate_sample_data("YouTube", n)
+    print(f"rows: {n:,}, frame: {df.memory_usage(deep=True).sum() / 1e6:,.0f} MB")
+    with tempfile.TemporaryDirectory() as root:
+        store = DatasetStore(root)
+        key = store.put(df)
+        print(f"store file: {os.path.getsize(store.path(key)) / 1e6:,.0f} MB")
+        df.to_pickle(os.path.join(root, "copy.pkl"))
+        del df
+        run("mmap", sessions, lambda: store.open(key))
+        run("copies", sessions, lambda: pd.read_pickle(os.path.join(root, "copy.pkl")))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000, int(sys.argv[2]) if len(sys.argv) > 2 else 8)
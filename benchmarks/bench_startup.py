@@ -0,0 +1,61 @@
+"""Cold import and first-render time of the dashboard pages.
+
+Each measurement runs in a fresh interpreter, so nothing is already in
+sys.modules. For every target it prints wall time and which heavy
+libraries (scikit-learn, XGBoost, SciPy, Plotly) ended up loaded; pages
+that only show data should not load the ML stack. (Streamlit itself
+imports Plotly, so it shows up for every render.)
+
+Usage: python benchmarks/bench_startup.py [repeats]
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PAGES = os.path.join(ROOT, "src", "dashboard")
+HEAVY = ["sklearn", "xgboost", "scipy", "plotly"]
+
+IMPORTS = [
+    "src.data_processing.schema",
+    "src.models.engagement_predictor",
+    "src.models.manipulation_detector",
+    "src.pipeline",
+]
+RENDERS = ["Home.py", "pages/0_Analysis.py", "pages/3_Detect.py"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _run(body):
+    code = _PROBE.format(body=body, heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                         env={**os.environ, "PYTHONPATH": ROOT}, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _render_body(page):
+    # AppTest runs the page script the way a Streamlit worker would on first visit
+    return (f"from streamlit.testing.v1 import AppTest\n"
+            f"AppTest.from_file({os.path.join(PAGES, page)!r}, default_timeout=120).run()")
+
+
+def main(repeats):
+    targets = [(f"import {m}", f"import {m}") for m in IMPORTS]
+    targets += [(f"render {p}", _render_body(p)) for p in RENDERS]
+    print(f"{'target':<45} {'best s':>8}  heavy modules loaded")
+    for label, body in targets:
+        runs = [_run(body) for _ in range(repeats)]
+        best = min(r["seconds"] for r in runs)
+        print(f"{label:<45} {best:>8.3f}  {', '.join(runs[0]['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,61 @@
+"""Training and inference time of the engagement predictor.
+
+Times hold-out training, then batch prediction with each of the three
+candidate models in turn, and optionally cross-validated selection
+(--cv K). Preprocessing is timed on its own too: building the model
+input (float32 matrix, scaled only for models that need it) from the
+prepared features.
+
+Usage: python benchmarks/bench_training.py [n_rows] [--cv K]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_processing.schema import generate_sample_data
+from src.models.engagement_predictor import EngagementPredictor
+
+TARGET = "engagement_rate"
+
+
+def best_of(fn, repeats=3):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(n, cv=0):
+    df = generate_sample_data("YouTube", 2_000)
+    posts = df.loc[np.tile(np.arange(len(df)), max(n // len(df), 1))].reset_index(drop=True)
+    print(f"rows: {len(posts):,}")
+
+    predictor = EngagementPredictor()
+    start = time.perf_counter()
+    training = predictor.train(posts, TARGET)
+    print(f"train (hold-out): {time.perf_counter() - start:.2f}s, best {training['best_model']}")
+
+    features, _ = predictor.prepare_features(posts)
+    print(f"model input: {best_of(lambda: predictor.model_input(features, TARGET)) * 1e3:.1f} ms")
+    for name, result in training["results"].items():
+        predictor.models[TARGET] = result["model"]
+        seconds = best_of(lambda: predictor.predict(posts, TARGET))
+        print(f"predict {name:<18} {seconds:.3f}s ({len(posts) / seconds:,.0f} rows/s), R² {result['r2']:.4f}")
+
+    if cv:
+        start = time.perf_counter()
+        training = EngagementPredictor().train(posts, TARGET, cv=cv)
+        print(f"train (cv={cv}, halving): {time.perf_counter() - start:.2f}s, best {training['best_model']} {training['best_params']}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    cv = int(args[args.index("--cv") + 1]) if "--cv" in args else 0
+    rows = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or args[i - 1] != "--cv")]
+    main(int(rows[0]) if rows else 200_000, cv)
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from src.data_processing.schema import map_and_validate_csv, STANDARD_COLUMNS
+from src.models.near_duplicates import NearDuplicateDetector
 
 # Page config
 st.set_page_config(page_title="Strategic Content Analyzer", layout="wide", initial_sidebar_state="expanded")
@@ -239,16 +240,13 @@ st.markdown("<h1>Strategic Content Analyzer</h1>", unsafe_allow_html=True)
 st.markdown("<p class='subtitle'>Upload a real platform export CSV. We decode safely, detect platform by schema, and map into a standard dataset for analysis.</p>", unsafe_allow_html=True)
 
 # Helper functions
-def _metric_coverage(df: pd.DataFrame) -> pd.DataFrame:
-    rows = []
-    for c in ["views", "impressions", "reach", "likes", "comments", "shares", "saves", "watch_time_seconds", "duration_seconds"]:
-        if c not in df.columns:
-            continue
-        non_null = int(df[c].notna().sum())
-        total = int(len(df))
-        pct = round((non_null / total) * 100, 2) if total else 0.0
-        rows.append({"metric": c, "non_null_rows": non_null, "total_rows": total, "coverage_percent": pct})
-    return pd.DataFrame(rows)
+@st.cache_data(show_spinner=False)
+def _load_and_validate(file_bytes: bytes, platform_choice: str):
+    return map_and_validate_csv(file_bytes, platform_choice=platform_choice)
+
+@st.cache_data(show_spinner=False)
+def _near_duplicate_clusters(titles: pd.Series) -> pd.DataFrame:
+    return NearDuplicateDetector().find_clusters(titles)
 
 def _text_preview(df: pd.DataFrame, col: str, n: int = 10) -> pd.DataFrame:
     if col not in df.columns:
@@ -286,7 +284,7 @@ choice_map = {
 file_bytes = uploaded.getvalue()
 
 try:
-    mapped_df, report = map_and_validate_csv(file_bytes, platform_choice=choice_map[platform_choice])
+    mapped_df, report = _load_and_validate(file_bytes, choice_map[platform_choice])
 except TypeError as e:
     st.error("⚠️ Your schema.py function signature does not match what app.py is calling.")
     st.code(str(e))
@@ -314,8 +312,8 @@ with tab1:
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Rows", f"{len(mapped_df):,}")
     c2.metric("Columns", f"{len(mapped_df.columns):,}")
-    c3.metric("Non-empty titles", int(mapped_df["title"].notna().sum()))
-    c4.metric("Non-empty captions", int(mapped_df["caption"].notna().sum()))
+    c3.metric("Non-empty titles", report.column_stats["title"].non_null)
+    c4.metric("Duplicate post IDs", f"{report.duplicate_post_id_rate}%")
 
 with tab2:
     st.subheader("What was mapped (source column → standard column)")
@@ -341,8 +339,12 @@ with tab2:
 
 with tab3:
     st.subheader("Metric coverage")
-    cov = _metric_coverage(mapped_df)
-    st.dataframe(cov, use_container_width=True, height=300)
+    st.dataframe(report.coverage_frame(), use_container_width=True, height=300)
+
+    impossible = {k: v for k, v in report.impossible_values.items() if v}
+    if impossible:
+        st.warning("⚠️ Some rows have values that cannot occur in a real export.")
+        st.dataframe(pd.DataFrame(list(impossible.items()), columns=["check", "rows"]), use_container_width=True)
     
     st.markdown("")
     st.subheader("Text sanity check")
@@ -357,8 +359,15 @@ with tab3:
     
     st.markdown("")
     st.subheader("Duplicate content check")
-    if "caption" in mapped_df.columns:
-        dup = mapped_df["caption"].fillna("").astype(str)
-        dup_rate = round((dup.duplicated().sum() / max(len(dup), 1)) * 100, 2)
-        st.write(f"Duplicate caption rate: **{dup_rate}%**")
+    if "title" in mapped_df.columns:
+        st.write(f"Duplicate caption rate: **{report.duplicate_title_rate}%**")
+        clusters = _near_duplicate_clusters(mapped_df["title"])
+        in_cluster = clusters["duplicate_cluster_size"] > 1
+        near_dup_rate = round(in_cluster.mean() * 100, 2) if len(clusters) else 0.0
+        st.write(f"Near-duplicate caption rate: **{near_dup_rate}%** across {clusters.loc[in_cluster, 'duplicate_cluster_id'].nunique():,} clusters")
+        if in_cluster.any():
+            top = (mapped_df.loc[in_cluster, ["title"]].join(clusters)
+                   .sort_values("duplicate_cluster_size", ascending=False)
+                   .drop_duplicates("duplicate_cluster_id").head(10))
+            st.dataframe(top, use_container_width=True)
         st.write("High duplication can be real for some datasets (like trending reposts), but if everything is identical, your mapping is pointing to the wrong column.")
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""Background execution of training and detection for the dashboard pages.
+
+Jobs run on a small thread pool shared by every session of the server
+process, so a page submits work, stores the job id and returns at once;
+later reruns poll the job for progress, partial results and the final
+result. Submitting a job whose key is already queued or running returns
+the existing job instead of starting a duplicate.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    """State of one background run; fields are written by the worker thread only."""
+
+    def __init__(self, key: Hashable, label: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.label = label
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.partial = None
+        self.result = None
+        self.error: Optional[str] = None
+        self.result_path: Optional[str] = None
+        self.submitted = time.time()
+        self.finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def report(self, progress: float, message: str = "", partial=None) -> None:
+        """Progress callback handed to job functions"""
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if message:
+            self.message = message
+        if partial is not None:
+            self.partial = partial
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.time()) - self.submitted
+
+
+class JobRunner:
+    """Thread pool plus a bounded registry of recent jobs.
+
+    Finished results stay in memory until ``keep`` newer jobs have been
+    submitted; with ``persist_dir`` set they are also pickled there, so a
+    result can be reloaded after it has been evicted.
+    """
+
+    def __init__(self, max_workers: int = 2, keep: int = 32, persist_dir: Optional[str] = None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sca-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+        self.keep = keep
+        self.persist_dir = persist_dir
+
+    def submit(self, key: Hashable, fn: Callable[..., object], *args, label: str = "", **kwargs) -> Job:
+        """Run fn(*args, report=job.report, **kwargs) in the background"""
+        with self._lock:
+            running = self._active.get(key)
+            if running is not None:
+                return running
+            job = Job(key, label or getattr(fn, "__name__", "job"))
+            self._jobs[job.id] = job
+            self._active[key] = job
+            while len(self._jobs) > self.keep:
+                oldest = next(iter(self._jobs))
+                if not self._jobs[oldest].done:
+                    break
+                self._jobs.pop(oldest)
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn, args, kwargs) -> None:
+        job.status, job.message = RUNNING, "Starting"
+        try:
+            job.result = fn(*args, report=job.report, **kwargs)
+            if self.persist_dir:
+                os.makedirs(self.persist_dir, exist_ok=True)
+                job.result_path = os.path.join(self.persist_dir, f"{job.id}.pkl")
+                pd.to_pickle(job.result, job.result_path)
+            job.progress, job.message, job.status = 1.0, "Done", DONE
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.message, job.status = "Failed", FAILED
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        return self._jobs.get(job_id) if job_id else None
+
+    def load(self, job: Job):
+        """The job's result, reloaded from persist_dir if it is no longer in memory"""
+        if job.result is None and job.result_path and os.path.exists(job.result_path):
+            job.result = pd.read_pickle(job.result_path)
+        return job.result
+
+
+JOBS = JobRunner(persist_dir=os.environ.get("SCA_JOB_DIR") or None)
+
+
+# ── Job functions ──────────────────────────────────────────────────────────
+
+def train_predictor(df: pd.DataFrame, target_metric: str = "engagement_rate", report=None):
+    """Engagement model for df via the shared model cache"""
+    from src.models.models import cached_predictor
+    report(0.02, "Preparing features")
+    return cached_predictor(df, target_metric, progress=lambda f, msg: report(0.05 + 0.9 * f, msg))
+
+
+def run_detection(df: pd.DataFrame, report=None) -> pd.DataFrame:
+    """Fitted Isolation Forest plus rule signals; rule-only results are published as a partial result"""
+    from src.models.manipulation_detector import ManipulationDetector
+    from src.models.rules import RuleContext
+
+    detector = ManipulationDetector()
+    report(0.05, "Fitting Isolation Forest")
+    detector.fit(df)
+    report(0.4, "Evaluating rule signals")
+    # One context for both passes, so derived columns (velocity, clusters) are computed once
+    context = RuleContext(df)
+    rule_results, _ = detector.detect_all(df, context)
+    report(0.6, "Scoring anomalies", partial=rule_results)
+    return detector.predict(df, context)
+
+
+def show_progress(job: Job, interval: float = 1.0) -> None:
+    """Progress bar that polls the job and reruns the page once it finishes"""
+    import streamlit as st
+
+    @st.fragment(run_every=interval)
+    def _poll():
+        if job.done:
+            st.rerun()
+        st.progress(job.progress, text=f"{job.label}: {job.message} ({job.elapsed:.0f}s)")
+
+    _poll()
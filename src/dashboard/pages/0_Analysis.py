@@ -6,6 +6,9 @@ import pandas as pd
 import plotly.express as px
 
 from src.data_processing.schema import process_upload, generate_sample_data
+from src.dashboard.render_data import (RAW_POINT_LIMIT, cached, density_grid, histogram, quantile_sketches,
+                                       share_dataset, time_series)
+from src.dashboard.table import paged_table
 
 st.set_page_config(page_title="Analysis — SCA", page_icon="📊", layout="wide", initial_sidebar_state="collapsed")
 
@@ -60,6 +63,8 @@ if df is None:
     st.info("👆 Select a data source above to begin.")
     st.stop()
 
+# Sessions keep a read-only view of the shared on-disk copy instead of their own frame
+df = share_dataset(df)
 st.session_state["df"] = df
 
 st.markdown("---")
@@ -79,24 +84,41 @@ st.markdown("<br>", unsafe_allow_html=True)
 tab1, tab2, tab3 = st.tabs(["📋 Data Preview", "📈 Visualizations", "🗺️ Mapping Report"])
 
 with tab1:
-    st.dataframe(df.head(50), use_container_width=True, height=400)
+    paged_table(df, key="preview", columns=list(df.columns), score_column="authenticity_score")
+
+# One seeded sketch per metric replaces full sorts for every percentile below; built once per dataset
+sketches = cached(df, quantile_sketches, columns=("views", "likes", "comments", "shares", "engagement_rate"))
 
 with tab2:
     v1, v2 = st.columns(2)
     with v1:
-        fig = px.histogram(df, x="engagement_rate", nbins=40, title="Engagement Rate Distribution", color_discrete_sequence=["#14B8A6"])
-        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font_color="#94A3B8", title_font_color="#E2E8F0")
+        # Charts get pre-aggregated frames, so their size does not grow with the dataset
+        hist = cached(df, histogram, column="engagement_rate", bins=40)
+        fig = px.bar(hist, x="x", y="count", title="Engagement Rate Distribution", color_discrete_sequence=["#14B8A6"],
+            labels={"x": "engagement_rate"})
+        fig.update_layout(bargap=0, paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font_color="#94A3B8", title_font_color="#E2E8F0")
         st.plotly_chart(fig, use_container_width=True)
     with v2:
-        fig2 = px.scatter(df[df["views"] < df["views"].quantile(0.99)], x="views", y="engagement_rate",
-            color="manipulation_flag", color_discrete_map={True:"#EF4444", False:"#14B8A6"},
-            title="Views vs Engagement Rate", opacity=0.6)
+        views_p99 = float(sketches["views"].quantile(0.99))
+        if len(df) <= RAW_POINT_LIMIT:
+            fig2 = px.scatter(df[df["views"] < views_p99], x="views", y="engagement_rate",
+                color="manipulation_flag", color_discrete_map={True:"#EF4444", False:"#14B8A6"},
+                title="Views vs Engagement Rate", opacity=0.6)
+        else:
+            # Filtered inside the cached aggregate, so reruns hit the cache keyed on df
+            cells = cached(df, density_grid, x="views", y="engagement_rate", by="manipulation_flag", x_below=views_p99)
+            fig2 = px.scatter(cells, x="views", y="engagement_rate", size="count", size_max=18,
+                color="manipulation_flag", color_discrete_map={True:"#EF4444", False:"#14B8A6"},
+                title=f"Views vs Engagement Rate ({int(cells['count'].sum()):,} posts, binned)", opacity=0.6)
         fig2.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font_color="#94A3B8", title_font_color="#E2E8F0")
         st.plotly_chart(fig2, use_container_width=True)
+    pct_levels = [0.5, 0.9, 0.99, 0.999]
+    pct_table = pd.DataFrame({m: sk.quantile(pct_levels) for m, sk in sketches.items()},
+                             index=[f"p{q * 100:g}" for q in pct_levels]).T
+    st.markdown("**Distribution percentiles**")
+    st.dataframe(pct_table.round(2), use_container_width=True)
     try:
-        ts = df.copy()
-        ts["date"] = pd.to_datetime(ts["date"])
-        ts = ts.groupby("date")["views"].sum().reset_index()
+        ts = cached(df, time_series, date="date", value="views")
         fig3 = px.line(ts, x="date", y="views", title="Views Over Time", color_discrete_sequence=["#7C3AED"])
         fig3.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font_color="#94A3B8", title_font_color="#E2E8F0")
         st.plotly_chart(fig3, use_container_width=True)
@@ -108,6 +130,11 @@ with tab3:
         st.dataframe(pd.DataFrame(list(mapping_report["mapped"].items()), columns=["Standard Metric","Source Column"]), use_container_width=True)
     if mapping_report.get("missing"):
         st.warning(f"Missing fields: {', '.join(mapping_report['missing'])}")
+    if mapping_report.get("memory"):
+        memory = mapping_report["memory"]
+        st.caption(f"In memory: {memory['bytes_after'] / 2**20:,.1f} MB with compact dtypes "
+                   f"({memory['bytes_before'] / 2**20:,.1f} MB before, "
+                   f"{memory['bytes_before'] / max(memory['bytes_after'], 1):.1f}x smaller).")
 
 st.markdown("---")
 st.markdown("*Use the sidebar to navigate to Predict → Explain → Detect*")
@@ -4,11 +4,26 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 
 from src.data_processing.schema import generate_sample_data
-from src.models.models import EngagementPredictor
+from src.dashboard.jobs import DONE, FAILED, JOBS, show_progress, train_predictor
+from src.dashboard.render_data import cached_stage, dataset_version, share_dataset
+
+
+def full_predictions(df, predictor):
+    out = df.copy(deep=False)
+    out["predicted_engagement"] = predictor.predict(df).round(2)
+    out["prediction_error"] = (out["predicted_engagement"] - out["engagement_rate"]).round(2)
+    return out
+
+
+def r2_score(df, predictor):
+    return predictor.score(df)
+
+
+def top_features(df, predictor):
+    return predictor.feature_importance().head(10)
+
 
 st.set_page_config(page_title="Predict — SCA", page_icon="🔮", layout="wide", initial_sidebar_state="collapsed")
 
@@ -40,28 +55,41 @@ st.markdown('<div class="page-sub">Random Forest model predicts engagement rate.
 df = st.session_state.get("df", None)
 if df is None:
     st.warning("⚠️ No data loaded. Using YouTube demo data.")
-    df = generate_sample_data("YouTube", 200)
+    df = share_dataset(generate_sample_data("YouTube", 200))
     st.session_state["df"] = df
 
 if st.button("🚀 Train Prediction Model"):
-    with st.spinner("Training Random Forest..."):
-        predictor = EngagementPredictor().fit(df)
+    # Trains in the background; the model cache shares it with every session on the same data
+    job = JOBS.submit(("train", dataset_version(df)), train_predictor, df, label="Training")
+    st.session_state["train_job"] = job.id
+
+job = JOBS.get(st.session_state.get("train_job"))
+if job is not None:
+    if job.status == DONE:
+        predictor = JOBS.load(job)
         st.session_state["predictor"] = predictor
-    st.success(f"✅ Model trained! R² score: {predictor.score(df):.4f}")
+        del st.session_state["train_job"]
+        st.success(f"✅ Model trained! R² score: {cached_stage(df, predictor, r2_score):.4f}")
+    elif job.status == FAILED:
+        del st.session_state["train_job"]
+        st.error(f"❌ Training failed: {job.error}")
+    else:
+        show_progress(job)
 
 predictor = st.session_state.get("predictor", None)
 if predictor is None:
     st.info("👆 Click 'Train Prediction Model' to get started.")
     st.stop()
 
-df_pred = df.copy()
-df_pred["predicted_engagement"] = predictor.predict(df).round(2)
-df_pred["prediction_error"] = (df_pred["predicted_engagement"] - df_pred["engagement_rate"]).round(2)
+import plotly.express as px  # charts only render once a model is trained
+
+# Full-dataset stages run once per model; slider reruns below only score the single post
+df_pred = cached_stage(df, predictor, full_predictions)
 
 st.markdown("---")
 c1, c2, c3, c4 = st.columns(4)
 for col, (lbl, val) in zip([c1,c2,c3,c4], [
-    ("R² Score", f"{predictor.score(df):.4f}"),
+    ("R² Score", f"{cached_stage(df, predictor, r2_score):.4f}"),
     ("Mean Predicted", f"{df_pred['predicted_engagement'].mean():.2f}%"),
     ("Mean Actual", f"{df_pred['engagement_rate'].mean():.2f}%"),
     ("Mean Error", f"{df_pred['prediction_error'].abs().mean():.2f}%"),
@@ -81,7 +109,7 @@ with ch1:
     st.plotly_chart(fig, use_container_width=True)
 
 with ch2:
-    imp_df = predictor.feature_importance().head(10)
+    imp_df = cached_stage(df, predictor, top_features)
     fig2 = px.bar(imp_df, x="importance", y="feature", orientation="h", title="Feature Importance",
         color="importance", color_continuous_scale=["#1E293B","#8B5CF6"])
     fig2.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font_color="#94A3B8",
@@ -6,7 +6,18 @@ import pandas as pd
 import plotly.graph_objects as go
 
 from src.data_processing.schema import generate_sample_data
-from src.models.models import EngagementPredictor, Explainer
+from src.models.models import Explainer
+from src.dashboard.jobs import DONE, FAILED, JOBS, show_progress, train_predictor
+from src.dashboard.render_data import cached_stage, dataset_version, share_dataset
+
+
+def global_importance(df, predictor):
+    return Explainer(predictor).explain_global()
+
+
+def post_explanation(df, predictor, idx):
+    return Explainer(predictor).explain_row(df.iloc[idx])
+
 
 st.set_page_config(page_title="Explain — SCA", page_icon="🧠", layout="wide", initial_sidebar_state="collapsed")
 
@@ -35,19 +46,32 @@ st.markdown('<div class="page-sub">Understand which features drive each predicti
 
 df = st.session_state.get("df", None)
 if df is None:
-    df = generate_sample_data("YouTube", 200)
+    df = share_dataset(generate_sample_data("YouTube", 200))
     st.session_state["df"] = df
 
 predictor = st.session_state.get("predictor", None)
 if predictor is None:
-    with st.spinner("Training model..."):
-        predictor = EngagementPredictor().fit(df)
+    # Same background job and session key as the Predict page
+    job = JOBS.get(st.session_state.get("train_job"))
+    if job is None:
+        job = JOBS.submit(("train", dataset_version(df)), train_predictor, df, label="Training")
+        st.session_state["train_job"] = job.id
+    if job.status == DONE:
+        predictor = JOBS.load(job)
         st.session_state["predictor"] = predictor
+        del st.session_state["train_job"]
+    elif job.status == FAILED:
+        del st.session_state["train_job"]
+        st.error(f"❌ Training failed: {job.error}")
+        st.stop()
+    else:
+        show_progress(job)
+        st.stop()
 
 explainer = Explainer(predictor)
 
 st.markdown("### 🌍 Global Feature Importance")
-global_imp = explainer.explain_global()
+global_imp = cached_stage(df, predictor, global_importance)
 colors = ["#F59E0B" if i < 3 else "#334155" for i in range(len(global_imp))]
 fig = go.Figure()
 fig.add_trace(go.Bar(x=global_imp["importance"], y=global_imp["feature"], orientation="h",
@@ -67,12 +91,13 @@ sample_row = st.session_state.get("sample_row", None)
 if sample_row is not None:
     st.info("Using the post configured in the Predict page.")
     row_to_explain = sample_row
+    with st.spinner("Computing contributions..."):
+        contrib_df = explainer.explain_row(row_to_explain)
 else:
     idx = st.slider("Select Post Index", 0, len(df)-1, 0)
     row_to_explain = df.iloc[idx]
-
-with st.spinner("Computing contributions..."):
-    contrib_df = explainer.explain_row(row_to_explain)
+    # Each post is explained once per model; revisiting an index is a cache hit
+    contrib_df = cached_stage(df, predictor, post_explanation, idx=idx)
 
 if contrib_df.empty:
     st.warning("Could not compute explanation.")
@@ -4,10 +4,13 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 
 from src.data_processing.schema import generate_sample_data
-from src.models.models import ManipulationDetector
+from src.models.signals import signal_counts, signal_names
+from src.dashboard.render_data import RAW_POINT_LIMIT, cached, density_grid, histogram, top_k
+from src.dashboard.table import paged_table
+from src.dashboard.jobs import DONE, FAILED, JOBS, run_detection, show_progress
+from src.dashboard.render_data import dataset_version, share_dataset
 
 st.set_page_config(page_title="Detect — SCA", page_icon="🛡️", layout="wide", initial_sidebar_state="collapsed")
 
@@ -40,21 +43,38 @@ st.markdown('<div class="page-sub">Isolation Forest + rule-based signals detect
 
 df = st.session_state.get("df", None)
 if df is None:
-    df = generate_sample_data("YouTube", 200)
+    df = share_dataset(generate_sample_data("YouTube", 200))
     st.session_state["df"] = df
 
 if st.button("🔍 Run Manipulation Detection"):
-    with st.spinner("Running detection..."):
-        detector = ManipulationDetector().fit(df)
-        result_df = detector.predict(df)
-        st.session_state["detect_df"] = result_df
-    st.success("✅ Detection complete!")
+    job = JOBS.submit(("detect", dataset_version(df)), run_detection, df, label="Detection")
+    st.session_state["detect_job"] = job.id
+
+job = JOBS.get(st.session_state.get("detect_job"))
+if job is not None:
+    if job.status == DONE:
+        st.session_state["detect_df"] = JOBS.load(job)
+        del st.session_state["detect_job"]
+        st.success("✅ Detection complete!")
+    elif job.status == FAILED:
+        del st.session_state["detect_job"]
+        st.error(f"❌ Detection failed: {job.error}")
+    else:
+        show_progress(job)
+        if job.partial is not None:
+            # Rule signals are ready before the Isolation Forest has scored every post
+            partial_counts = signal_counts(job.partial["risk_flags"])
+            rule_flagged = int((job.partial["risk_flags"].to_numpy() != 0).sum())
+            st.markdown(f"**Rule signals so far:** {rule_flagged:,} of {len(job.partial):,} posts carry at least one signal")
+            st.dataframe(partial_counts[partial_counts > 0].rename("Posts").to_frame(), use_container_width=True)
 
 result_df = st.session_state.get("detect_df", None)
 if result_df is None:
     st.info("👆 Click 'Run Manipulation Detection' to analyze.")
     st.stop()
 
+import plotly.express as px  # charts only render once there are results
+
 flagged   = result_df["manipulation_flag"].sum()
 clean     = len(result_df) - flagged
 avg_auth  = result_df["authenticity_score"].mean()
@@ -74,8 +94,10 @@ tab1, tab2, tab3 = st.tabs(["📊 Overview", "🗺️ Anomaly Map", "📋 Flagge
 with tab1:
     v1, v2 = st.columns(2)
     with v1:
-        fig = px.histogram(result_df, x="authenticity_score", nbins=30,
-            title="Authenticity Score Distribution", color_discrete_sequence=["#14B8A6"])
+        hist = cached(result_df, histogram, column="authenticity_score", bins=30)
+        fig = px.bar(hist, x="x", y="count", title="Authenticity Score Distribution",
+            color_discrete_sequence=["#14B8A6"], labels={"x": "authenticity_score"})
+        fig.update_layout(bargap=0)
         fig.add_vline(x=40, line_dash="dash", line_color="#EF4444",
             annotation_text="Risk Threshold", annotation_font_color="#EF4444")
         fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font_color="#94A3B8", title_font_color="#E2E8F0")
@@ -87,41 +109,50 @@ with tab1:
         fig2.update_layout(paper_bgcolor="rgba(0,0,0,0)", font_color="#94A3B8", title_font_color="#E2E8F0")
         st.plotly_chart(fig2, use_container_width=True)
 
-    from collections import Counter
-    all_signals = []
-    for s in result_df["signals"]: all_signals.extend(s)
-    if all_signals:
-        sig_df = pd.DataFrame(Counter(all_signals).items(), columns=["Signal","Count"]).sort_values("Count")
+    counts = signal_counts(result_df["risk_flags"])
+    if counts.sum():
+        sig_df = counts[counts > 0].rename_axis("Signal").reset_index(name="Count").sort_values("Count")
         fig3 = px.bar(sig_df, x="Count", y="Signal", orientation="h",
             title="Most Common Signals", color_discrete_sequence=["#EF4444"])
         fig3.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font_color="#94A3B8", title_font_color="#E2E8F0")
         st.plotly_chart(fig3, use_container_width=True)
 
 with tab2:
-    fig4 = px.scatter(result_df, x="likes", y="comments", color="manipulation_flag",
-        size="authenticity_score", color_discrete_map={True:"#EF4444",False:"#14B8A6"},
-        title="Likes vs Comments — Anomaly Map", opacity=0.7,
-        hover_data=["authenticity_score","anomaly_score"])
+    if len(result_df) <= RAW_POINT_LIMIT:
+        fig4 = px.scatter(result_df, x="likes", y="comments", color="manipulation_flag",
+            size="authenticity_score", color_discrete_map={True:"#EF4444",False:"#14B8A6"},
+            title="Likes vs Comments — Anomaly Map", opacity=0.7,
+            hover_data=["authenticity_score","anomaly_score"])
+    else:
+        cells = cached(result_df, density_grid, x="likes", y="comments", by="manipulation_flag",
+                       mean_of="authenticity_score")
+        fig4 = px.scatter(cells, x="likes", y="comments", color="manipulation_flag", size="count", size_max=24,
+            color_discrete_map={True:"#EF4444",False:"#14B8A6"}, opacity=0.7,
+            title=f"Likes vs Comments — Anomaly Map ({len(result_df):,} posts, binned)",
+            hover_data=["count","authenticity_score"])
     fig4.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font_color="#94A3B8", title_font_color="#E2E8F0", height=500)
     st.plotly_chart(fig4, use_container_width=True)
 
 with tab3:
-    flagged_df = result_df[result_df["manipulation_flag"] == True].copy()
+    # The ten worst flagged posts are picked without sorting the whole result
+    flagged_df = cached(result_df, top_k, column="authenticity_score", k=10, mask="manipulation_flag")
     if flagged_df.empty:
         st.success("✅ No manipulation detected.")
     else:
-        display_cols = [c for c in ["post_id","date","views","likes","comments","engagement_rate","authenticity_score","anomaly_score","signal_count"] if c in flagged_df.columns]
-        st.dataframe(flagged_df[display_cols].sort_values("authenticity_score").head(50), use_container_width=True, height=400)
+        display_cols = ["post_id","date","title","views","likes","comments","engagement_rate","authenticity_score","anomaly_score","signal_count"]
+        paged_table(result_df, key="flagged", columns=display_cols, sort_by="authenticity_score",
+                    only="manipulation_flag", score_column="authenticity_score")
 
         st.markdown("#### Signal Breakdown (Top 10 worst)")
-        for i, (_, row) in enumerate(flagged_df.sort_values("authenticity_score").head(10).iterrows()):
+        for i, (_, row) in enumerate(flagged_df.iterrows()):
             with st.expander(f"Post {row.get('post_id','#'+str(i))} — Authenticity: {row['authenticity_score']:.0f}/100"):
                 s1, s2, s3 = st.columns(3)
                 s1.metric("Views",    f"{int(row['views']):,}")
                 s2.metric("Likes",    f"{int(row['likes']):,}")
                 s3.metric("Comments", f"{int(row['comments']):,}")
-                if row["signals"]:
-                    tags = " ".join([f'<span class="signal-tag">⚠ {s}</span>' for s in row["signals"]])
+                row_signals = signal_names(int(row["risk_flags"]))
+                if row_signals:
+                    tags = " ".join([f'<span class="signal-tag">⚠ {s}</span>' for s in row_signals])
                     st.markdown(tags, unsafe_allow_html=True)
                 else:
                     st.markdown('<span class="clean-tag">✓ Flagged by Isolation Forest only</span>', unsafe_allow_html=True)
@@ -0,0 +1,163 @@
+"""Server-side aggregates so charts stay small however many rows there are.
+
+Every helper returns a frame whose size depends only on its resolution
+(bins, grid cells, points, k), never on the number of posts, and
+``cached()`` memoizes it per dataset version so Streamlit reruns reuse it.
+"""
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Optional, Sequence
+
+from src.data_processing.fingerprint import dataset_version, remember_version
+from src.data_processing.sketches import QuantileSketch
+from src.data_processing.store import DATASETS
+from src.models.model_cache import ModelCache
+
+# Below this many rows scatter plots still draw individual posts
+RAW_POINT_LIMIT = 5_000
+
+
+def _nbytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    return int(getattr(value, "nbytes", 0))
+
+
+_AGGREGATES = ModelCache(max_entries=256, max_bytes=256 * 1024 * 1024, sizeof=_nbytes)
+
+
+def share_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Read-only view of df from the shared memory-mapped store, for keeping in session state.
+
+    Sessions on the same data get views of the same file, and the view's
+    version is known up front, so it is never fingerprinted again.
+    """
+    version = dataset_version(df)
+    view = DATASETS.share(df, key=version)
+    remember_version(view, version)
+    return view
+
+
+def cached(df: pd.DataFrame, fn: Callable[..., object], **params):
+    """fn(df, **params), memoized per dataset version and parameters"""
+    key = (dataset_version(df), fn.__module__, fn.__name__, tuple(sorted(params.items())))
+    return _AGGREGATES.get_or_train(key, lambda: fn(df, **params))
+
+
+def cached_stage(df: pd.DataFrame, model, fn: Callable[..., object], **params):
+    """fn(df, model, **params), memoized per dataset version, model version and parameters.
+
+    Streamlit reruns the whole page on every widget change; full-dataset
+    stages wrapped here run once per model, so a rerun only pays for what
+    actually depends on the changed widget.
+    """
+    version = getattr(model, "version", None) or id(model)
+    key = (dataset_version(df), version, fn.__module__, fn.__name__, tuple(sorted(params.items())))
+    return _AGGREGATES.get_or_train(key, lambda: fn(df, model, **params))
+
+
+def _finite(df: pd.DataFrame, column: str) -> np.ndarray:
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def histogram(df: pd.DataFrame, column: str, bins: int = 40) -> pd.DataFrame:
+    """Bin edges, centers and counts of a numeric column"""
+    values = _finite(df, column)
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return pd.DataFrame(columns=["x0", "x1", "x", "width", "count"])
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({"x0": edges[:-1], "x1": edges[1:], "x": (edges[:-1] + edges[1:]) / 2,
+                         "width": np.diff(edges), "count": counts})
+
+
+def quantile_sketches(df: pd.DataFrame, columns: Sequence[str], seed: int = 0) -> Dict[str, QuantileSketch]:
+    """One seeded quantile sketch per numeric column present in df"""
+    return {c: QuantileSketch(seed=seed).update(pd.to_numeric(df[c], errors="coerce"))
+            for c in columns if c in df.columns}
+
+
+def density_grid(df: pd.DataFrame, x: str, y: str, by: Optional[str] = None, bins: int = 80,
+                 mean_of: Optional[str] = None, x_below: Optional[float] = None) -> pd.DataFrame:
+    """Counts per cell of a bins x bins grid (optionally split by a column), empty cells dropped.
+
+    Cells are reported at the mean position of their posts, so sparse
+    outliers stay where they are rather than snapping to a cell center.
+    ``mean_of`` adds the per-cell mean of another column; ``x_below`` drops
+    posts whose x is not below it (e.g. a p99 cutoff).
+    """
+    xs, ys = _finite(df, x), _finite(df, y)
+    keep = np.isfinite(xs) & np.isfinite(ys)
+    if x_below is not None:
+        keep &= xs < x_below
+    columns = [x, y, "count"] + ([by] if by else []) + ([mean_of] if mean_of else [])
+    if not keep.any():
+        return pd.DataFrame(columns=columns)
+    xs, ys = xs[keep], ys[keep]
+
+    def cell(values):
+        lo, hi = values.min(), values.max()
+        scale = bins / (hi - lo) if hi > lo else 0.0
+        return np.minimum(((values - lo) * scale).astype(np.int64), bins - 1)
+
+    code = cell(xs) * bins + cell(ys)
+    if by:
+        groups, group_values = pd.factorize(df[by].to_numpy()[keep], use_na_sentinel=False)
+        code = code + groups.astype(np.int64) * bins * bins
+    uniques, inverse, counts = np.unique(code, return_inverse=True, return_counts=True)
+    out = pd.DataFrame({x: np.bincount(inverse, xs) / counts, y: np.bincount(inverse, ys) / counts, "count": counts})
+    if by:
+        out[by] = group_values[uniques // (bins * bins)]
+    if mean_of:
+        other = np.nan_to_num(_finite(df, mean_of)[keep])
+        out[mean_of] = np.bincount(inverse, other) / counts
+    return out
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the Largest-Triangle-Three-Buckets downsample of a series sorted by x"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    # First and last points are kept; n_out - 2 buckets cover the rest
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def time_series(df: pd.DataFrame, date: str, value: str, max_points: int = 1_500) -> pd.DataFrame:
+    """Sum of value per timestamp, LTTB-downsampled to at most max_points"""
+    series = df.groupby(date, sort=True)[value].sum()
+    if len(series) <= max_points:
+        return series.reset_index()
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy(dtype="float64")
+    idx = lttb(x.astype("float64"), series.to_numpy(dtype="float64"), max_points)
+    return series.iloc[idx].reset_index()
+
+
+def top_k(df: pd.DataFrame, column: str, k: int = 50, largest: bool = False,
+          mask: Optional[str] = None) -> pd.DataFrame:
+    """k rows with the smallest (or largest) column, among rows where the boolean column mask is set"""
+    rows = np.flatnonzero(df[mask].to_numpy(dtype=bool)) if mask else np.arange(len(df))
+    values = _finite(df, column)[rows]
+    values = np.where(np.isnan(values), -np.inf if largest else np.inf, values)
+    if largest:
+        values = -values
+    if len(rows) > k:
+        part = np.argpartition(values, k - 1)[:k]
+        rows, values = rows[part], values[part]
+    return df.iloc[rows[np.argsort(values, kind="stable")]]
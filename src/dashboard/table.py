@@ -0,0 +1,152 @@
+"""Paged, filtered and searchable tables over large result frames.
+
+A TableIndex is built once per dataset version (see render_data.cached)
+and keeps one argsort per sort column, so paging and filtering a
+million-row result only costs vectorized masks, never a re-sort.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.dashboard.render_data import cached
+from src.models.signals import SIGNAL_REGISTRY, has_signal
+
+_SEARCH_MEMO = 8
+
+
+ROW_ORDER = "Row order"
+
+
+@dataclass
+class TableQuery:
+    sort_by: Optional[str] = None
+    ascending: bool = True
+    signals: Sequence[str] = ()
+    score_column: Optional[str] = None
+    score_range: Optional[Tuple[float, float]] = None
+    search: str = ""
+    only: Optional[str] = None
+    page: int = 0
+    page_size: int = 50
+
+
+class TableIndex:
+    """Sort orders, flags and lowercased titles of one result frame."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n = len(df)
+        self._orders: Dict[str, Tuple[np.ndarray, int]] = {}
+        self._titles: Optional[pd.Series] = None
+        self._searches: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    @property
+    def nbytes(self) -> int:
+        # The frame itself belongs to the session; only count what the index adds
+        size = sum(o.nbytes for o, _ in self._orders.values()) + sum(m.nbytes for m in self._searches.values())
+        if self._titles is not None:
+            size += int(self._titles.memory_usage(deep=False))
+        return size
+
+    def order(self, column: Optional[str], ascending: bool = True) -> np.ndarray:
+        """Row positions sorted by column (None keeps row order), missing values last either way"""
+        if column is None:
+            return np.arange(self.n) if ascending else np.arange(self.n)[::-1]
+        if column not in self._orders:
+            values = self.df[column]
+            if pd.api.types.is_datetime64_any_dtype(values):
+                keys = values.to_numpy(dtype="datetime64[us]")
+            elif pd.api.types.is_numeric_dtype(values):
+                keys = values.to_numpy(dtype="float64", na_value=np.nan)
+            else:
+                keys = values.fillna("").astype(str).to_numpy(dtype=object)
+            # NumPy sorts NaN and NaT after every value
+            self._orders[column] = (np.argsort(keys, kind="stable"), int(values.notna().sum()))
+        order, valid = self._orders[column]
+        return order if ascending else np.r_[order[:valid][::-1], order[valid:]]
+
+    def _search(self, term: str) -> np.ndarray:
+        if term not in self._searches:
+            if self._titles is None:
+                titles = self.df["title"] if "title" in self.df.columns else pd.Series("", index=self.df.index)
+                self._titles = titles.fillna("").astype(str).str.lower()
+            self._searches[term] = self._titles.str.contains(term, regex=False).to_numpy(dtype=bool)
+            while len(self._searches) > _SEARCH_MEMO:
+                self._searches.popitem(last=False)
+        self._searches.move_to_end(term)
+        return self._searches[term]
+
+    def mask(self, query: TableQuery) -> np.ndarray:
+        keep = np.ones(self.n, dtype=bool)
+        if query.only:
+            keep &= self.df[query.only].to_numpy(dtype=bool)
+        if query.signals and "risk_flags" in self.df.columns:
+            keep &= has_signal(self.df["risk_flags"], list(query.signals))
+        if query.score_range is not None and query.score_column:
+            scores = pd.to_numeric(self.df[query.score_column], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            lo, hi = query.score_range
+            keep &= (scores >= lo) & (scores <= hi)
+        term = query.search.strip().lower()
+        if term:
+            keep &= self._search(term)
+        return keep
+
+    def matches(self, query: TableQuery) -> np.ndarray:
+        """Positions of all matching rows, in sort order"""
+        order = self.order(query.sort_by, query.ascending)
+        return order[self.mask(query)[order]]
+
+    def page(self, matches: np.ndarray, page: int, page_size: int) -> pd.DataFrame:
+        start = max(page, 0) * page_size
+        return self.df.iloc[matches[start:start + page_size]]
+
+    def query(self, query: TableQuery) -> Tuple[pd.DataFrame, int]:
+        """One page of matching rows in sort order, and the total number of matches"""
+        matches = self.matches(query)
+        return self.page(matches, query.page, query.page_size), len(matches)
+
+
+def table_index(df: pd.DataFrame) -> TableIndex:
+    """Shared TableIndex for this version of df"""
+    return cached(df, TableIndex)
+
+
+def paged_table(df: pd.DataFrame, key: str, columns: List[str], sort_by: Optional[str] = None, ascending: bool = True,
+                only: Optional[str] = None, score_column: Optional[str] = None, page_size: int = 50) -> pd.DataFrame:
+    """Filter, search and page controls plus the current page; returns the rows shown"""
+    import streamlit as st
+
+    index = table_index(df)
+    columns = [c for c in columns if c in df.columns]
+    has_flags = "risk_flags" in df.columns
+    c1, c2, c3, c4 = st.columns([2, 2, 2, 1])
+    with c1:
+        search = st.text_input("Search titles", key=f"{key}_search") if "title" in df.columns else ""
+    with c2:
+        signals = st.multiselect("Signals", list(SIGNAL_REGISTRY), key=f"{key}_signals") if has_flags else []
+    score_range = None
+    with c3:
+        if score_column and score_column in df.columns and df[score_column].notna().any():
+            lo, hi = float(np.floor(df[score_column].min())), float(np.ceil(df[score_column].max()))
+            if hi > lo:
+                score_range = st.slider(score_column.replace("_", " ").title(), lo, hi, (lo, hi), key=f"{key}_score")
+    with c4:
+        options = [ROW_ORDER] + columns
+        sort_col = st.selectbox("Sort by", options, index=options.index(sort_by) if sort_by in columns else 0,
+                                key=f"{key}_sort")
+        asc = st.toggle("Ascending", value=ascending, key=f"{key}_asc")
+
+    query = TableQuery(sort_by=None if sort_col == ROW_ORDER else sort_col, ascending=asc, signals=signals, score_column=score_column,
+                       score_range=score_range, search=search or "", only=only, page_size=page_size)
+    matches = index.matches(query)
+    pages = max(1, -(-len(matches) // page_size))
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages  # filters narrowed the result
+    page = int(st.number_input(f"Page (of {pages:,})", 1, pages, 1, key=f"{key}_page")) - 1
+    rows = index.page(matches, page, page_size)
+    st.caption(f"{len(matches):,} matching posts · showing {len(rows):,}")
+    st.dataframe(rows[columns], use_container_width=True, height=400)
+    return rows
@@ -0,0 +1,126 @@
+import warnings
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+DATE_SAMPLE_SIZE = 500
+MAX_FORMATS = 3
+# Every parsed column comes back in this dtype, whichever branch parsed it
+DATE_DTYPE = "datetime64[us, UTC]"
+# Dates outside Python's datetime range (e.g. epoch values in the far future) become NaT
+_FIRST_DAY, _LAST_DAY = np.datetime64("0001-01-01"), np.datetime64("9999-12-31")
+# Integers in this range are calendar dates (20240105), not epoch seconds in 1970
+YYYYMMDD_RANGE = (19000101, 21001231)
+
+
+def _spread_sample(values, size):
+    """Evenly spaced sample, so ambiguous leading rows (01/02/...) don't decide alone."""
+    if len(values) <= size:
+        return values.tolist()
+    return values.iloc[np.linspace(0, len(values) - 1, size).astype(int)].tolist()
+
+
+def _infer_format(sample):
+    """Pick the strptime format that parses most of a string sample."""
+    best, best_hits = None, 0
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        for dayfirst in (False, True):
+            guesses = Counter(guess_datetime_format(v, dayfirst=dayfirst) for v in sample)
+            guesses.pop(None, None)
+            if not guesses:
+                continue
+            fmt = guesses.most_common(1)[0][0]
+            hits = pd.to_datetime(pd.Series(sample), format=fmt, errors="coerce", utc=True).notna().sum()
+            if hits > best_hits:
+                best, best_hits = fmt, hits
+    return best
+
+
+def _as_date_dtype(parsed):
+    """``parsed`` (UTC datetimes of any unit) as DATE_DTYPE, out-of-range values as NaT."""
+    naive = parsed.dt.tz_localize(None).to_numpy()
+    # Day resolution compares any unit without overflowing
+    days = naive.astype("datetime64[D]")
+    naive = np.where((days >= _FIRST_DAY) & (days <= _LAST_DAY), naive, np.datetime64("NaT"))
+    return pd.Series(naive.astype("datetime64[us]"), index=parsed.index).dt.tz_localize("UTC")
+
+
+def _parse_numeric(values):
+    numeric = pd.to_numeric(values, errors="coerce")
+    present = numeric.dropna()
+    if len(present) and (present % 1 == 0).all() and present.between(*YYYYMMDD_RANGE).all():
+        digits = numeric.astype("Int64").astype("string")
+        return pd.to_datetime(digits, format="%Y%m%d", errors="coerce", utc=True), "%Y%m%d"
+    unit = "ms" if numeric.abs().max() >= 1e11 else "s"
+    return pd.to_datetime(numeric, unit=unit, errors="coerce", utc=True), f"epoch[{unit}]"
+
+
+def parse_dates(values, sample_size=DATE_SAMPLE_SIZE):
+    """Parse a raw date column once into UTC ``datetime64[us]``.
+
+    The format is inferred from a sample of the file and applied to the
+    whole column in one vectorized ``to_datetime`` call; repeated values are
+    parsed once via ``factorize``. Values that do not match the inferred
+    format are retried with mixed-format parsing. Numeric columns are
+    YYYYMMDD integers when every value is one, epoch seconds or
+    milliseconds otherwise. Dates outside years 1-9999 become NaT and
+    count against coverage.
+
+    Returns ``(series, stats)`` with ``format``, ``non_empty``, ``parsed`` and
+    ``coverage`` in stats.
+    """
+    s = pd.Series(values) if not isinstance(values, pd.Series) else values
+    s = s.reset_index(drop=True)
+    fmt = None
+
+    if isinstance(s.dtype, pd.DatetimeTZDtype):
+        out, fmt = _as_date_dtype(s.dt.tz_convert("UTC")), "datetime"
+    elif pd.api.types.is_datetime64_dtype(s):
+        out, fmt = _as_date_dtype(s.dt.tz_localize("UTC")), "datetime"
+    elif pd.api.types.is_numeric_dtype(s):
+        out, fmt = _parse_numeric(s)
+        out = _as_date_dtype(out)
+    else:
+        codes, uniques = pd.factorize(s)
+        uniques = pd.Series(uniques, dtype=object).astype(str).str.strip()
+        parsed = pd.Series(pd.NaT, index=uniques.index, dtype=DATE_DTYPE)
+        formats = []
+        residue = np.ones(len(uniques), dtype=bool)
+        for _ in range(MAX_FORMATS):
+            fmt = _infer_format(_spread_sample(uniques[residue], sample_size))
+            if fmt is None:
+                break
+            formats.append(fmt)
+            parsed[residue] = _as_date_dtype(pd.to_datetime(uniques[residue], format=fmt, errors="coerce", utc=True))
+            residue = parsed.isna().to_numpy()
+            if not residue.any():
+                break
+        if residue.any():
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                parsed[residue] = _as_date_dtype(pd.to_datetime(uniques[residue], format="mixed", errors="coerce", utc=True))
+        fmt = " | ".join(formats) or None
+        out = pd.Series(parsed.array.take(codes, allow_fill=True))
+
+    non_empty = int(s.notna().sum())
+    parsed_count = int(out.notna().sum())
+    stats = {
+        "format": fmt,
+        "non_empty": non_empty,
+        "parsed": parsed_count,
+        "coverage": round(parsed_count / non_empty, 4) if non_empty else 0.0,
+    }
+    return out, stats
+
+
+def ensure_datetime(values):
+    """Return ``values`` as UTC datetimes, reusing already-typed columns as-is."""
+    if isinstance(getattr(values, "dtype", None), pd.DatetimeTZDtype):
+        return values
+    parsed, _ = parse_dates(values)
+    if isinstance(values, pd.Series):
+        parsed.index = values.index
+    return parsed
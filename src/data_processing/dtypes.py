@@ -0,0 +1,92 @@
+"""Compact dtypes for standardized frames.
+
+Parsed metrics arrive as float64 and text as object columns, which is about
+twice the memory the data needs. ``apply_dtype_policy`` stores:
+
+- whole, non-negative counts in the smallest unsigned integer type that
+  leaves headroom for sums of several counts (nullable ``UInt*`` when the
+  column has gaps), other counts as float32;
+- rates and scores as float32;
+- the platform as a category, free text as Arrow-backed strings.
+
+Detection and modelling read metrics through float64 views (see
+``rules._as_float``), so compact counts give the same results; rates keep
+float32 precision, well below the two decimals they are reported with.
+"""
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data_processing.numeric import _STRING_DTYPE
+
+COUNT_COLUMNS = [
+    "views", "impressions", "reach",
+    "likes", "comments", "shares", "saves",
+    "watch_time", "duration",
+]
+RATE_COLUMNS = ["engagement_rate", "authenticity_score"]
+CATEGORY_COLUMNS = ["platform"]
+TEXT_COLUMNS = ["post_id", "author", "title"]
+
+# A count type must hold this multiple of the column maximum, so adding a
+# handful of counts (likes + comments + shares, views + 1) cannot wrap.
+COUNT_HEADROOM = 4
+_UNSIGNED = [np.uint8, np.uint16, np.uint32, np.uint64]
+
+
+def _count_dtype(values: np.ndarray):
+    """Smallest safe unsigned dtype for whole non-negative values, else a float wide enough to be exact"""
+    finite = values[~np.isnan(values)]
+    if not len(finite):
+        return np.float32
+    if finite.min() >= 0 and np.array_equal(finite, np.floor(finite)):
+        peak = float(finite.max()) * COUNT_HEADROOM
+        for dtype in _UNSIGNED:
+            if peak <= np.iinfo(dtype).max:
+                # NumPy integers cannot hold NaN; gaps need the masked nullable type
+                return dtype if len(finite) == len(values) else f"UInt{np.iinfo(dtype).bits}"
+    # float32 holds every whole number only up to 2**24
+    return np.float32 if np.abs(finite).max() <= 2 ** 24 else np.float64
+
+
+def _compact_count(column: pd.Series) -> pd.Series:
+    values = pd.to_numeric(column, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return pd.Series(values, index=column.index, name=column.name).astype(_count_dtype(values))
+
+
+def apply_dtype_policy(df: pd.DataFrame, counts: Iterable[str] = COUNT_COLUMNS) -> pd.DataFrame:
+    """Copy of a standardized frame with compact column dtypes; unknown columns are left as they are"""
+    out = df.copy(deep=False)
+    for col in counts:
+        if col in out.columns and pd.api.types.is_numeric_dtype(out[col]):
+            out[col] = _compact_count(out[col])
+    for col in RATE_COLUMNS:
+        if col in out.columns and pd.api.types.is_numeric_dtype(out[col]):
+            out[col] = pd.to_numeric(out[col], errors="coerce").astype(np.float32)
+    for col in CATEGORY_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].astype("category")
+    for col in TEXT_COLUMNS:
+        if col in out.columns and not pd.api.types.is_numeric_dtype(out[col]):
+            out[col] = out[col].astype(_STRING_DTYPE)
+        elif col in out.columns:
+            out[col] = pd.to_numeric(out[col], downcast="unsigned")
+    if "manipulation_flag" in out.columns:
+        out["manipulation_flag"] = out["manipulation_flag"].astype(bool)
+    return out
+
+
+def memory_report(before: pd.DataFrame, after: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Per-column dtype and deep memory use before and after the policy, with a total row"""
+    after = apply_dtype_policy(before) if after is None else after
+    old = before.memory_usage(index=False, deep=True)
+    new = after.memory_usage(index=False, deep=True)
+    rows = [{"column": c, "dtype_before": str(before[c].dtype), "dtype_after": str(after[c].dtype),
+             "bytes_before": int(old[c]), "bytes_after": int(new.get(c, 0))} for c in before.columns]
+    rows.append({"column": "total", "dtype_before": "", "dtype_after": "",
+                 "bytes_before": int(old.sum()), "bytes_after": int(new.sum())})
+    out = pd.DataFrame(rows)
+    out["saving"] = 1 - out["bytes_after"] / out["bytes_before"].where(out["bytes_before"] > 0)
+    return out
+
@@ -0,0 +1,38 @@
+"""Content fingerprints of standardized datasets.
+
+A fingerprint names a dataset by what it holds (rows, columns and dtypes),
+so caches and the shared store can recognise the same data however it was
+loaded. ``dataset_version`` remembers it per frame object, so a frame kept
+across reruns or requests is only hashed once.
+"""
+import hashlib
+import weakref
+from typing import Dict, Tuple
+
+import pandas as pd
+
+_VERSIONS: Dict[int, Tuple[weakref.ref, str]] = {}
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a frame: same rows, columns and dtypes give the same key"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def dataset_version(df: pd.DataFrame) -> str:
+    """Content fingerprint of df, computed once per frame object"""
+    entry = _VERSIONS.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    return remember_version(df, dataset_fingerprint(df))
+
+
+def remember_version(df: pd.DataFrame, version: str) -> str:
+    """Record df's fingerprint when it is already known (e.g. a view of a stored dataset)"""
+    for key in [k for k, (ref, _) in _VERSIONS.items() if ref() is None]:
+        del _VERSIONS[key]
+    _VERSIONS[id(df)] = (weakref.ref(df), version)
+    return version
@@ -0,0 +1,124 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+SUFFIX_MULTIPLIERS = {"K": 1e3, "M": 1e6, "B": 1e9}
+
+MISSING_TOKENS = ["", "-", "--", "—", "–", "N/A", "NA", "NAN", "NONE", "NULL", "?"]
+
+_PLAIN_NUMBER_RE = r"[+-]?[0-9][0-9.,]*|[+-]?[.,][0-9]+"
+_NUMBER_RE = r"^(" + _PLAIN_NUMBER_RE + r")([KMB])?$"
+_THOUSANDS_COMMA_RE = r"^[+-]?[0-9]{1,3}(?:,[0-9]{3})+$"
+_THOUSANDS_DOT_RE = r"^[+-]?[0-9]{1,3}(?:\.[0-9]{3}){2,}$"
+_STRIP_CHARS_RE = r"[\s'’_]"
+# Arrow-backed strings run the residue cleanup in compiled kernels instead of
+# per-element Python; fall back to the plain string dtype without pyarrow.
+try:
+    import pyarrow  # noqa: F401
+    _STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    _STRING_DTYPE = "string"
+
+_WORD_SUFFIXES = {"THOUSAND": "K", "MILLION": "M", "BILLION": "B", "MIL": "M", "MN": "M", "BN": "B"}
+
+
+def _normalize_separators(num, has_suffix):
+    """Turn thousands separators / decimal commas into plain float literals."""
+    has_dot = num.str.contains(".", regex=False)
+    has_comma = num.str.contains(",", regex=False)
+    out = num.copy()
+
+    both = has_dot & has_comma
+    if both.any():
+        sub = num[both]
+        comma_last = sub.str.rfind(",") > sub.str.rfind(".")
+        eu = sub[comma_last].str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+        us = sub[~comma_last].str.replace(",", "", regex=False)
+        out[eu.index] = eu
+        out[us.index] = us
+
+    comma_only = has_comma & ~has_dot
+    if comma_only.any():
+        sub = num[comma_only]
+        thousands = (sub.str.match(_THOUSANDS_COMMA_RE) & ~has_suffix[comma_only]) | (sub.str.count(",") > 1)
+        out[sub[thousands].index] = sub[thousands].str.replace(",", "", regex=False)
+        out[sub[~thousands].index] = sub[~thousands].str.replace(",", ".", regex=False)
+
+    dot_only = has_dot & ~has_comma
+    if dot_only.any():
+        sub = num[dot_only]
+        thousands = sub.str.match(_THOUSANDS_DOT_RE)
+        out[sub[thousands].index] = sub[thousands].str.replace(".", "", regex=False)
+
+    return out
+
+
+def _parse_one(value):
+    text = re.sub(_STRIP_CHARS_RE, "", str(value)).upper().replace("−", "-")
+    negative = text.startswith("(") and text.endswith(")")
+    text = text.strip("()").rstrip("%")
+    for word, suffix in _WORD_SUFFIXES.items():
+        if text.endswith(word):
+            text = text[: -len(word)] + suffix
+            break
+    match = re.match(_NUMBER_RE, text)
+    if not match:
+        return np.nan
+    parsed = _normalize_separators(pd.Series([match.group(1)], dtype=_STRING_DTYPE), pd.Series([bool(match.group(2))]))
+    number = pd.to_numeric(parsed, errors="coerce").iloc[0]
+    number *= SUFFIX_MULTIPLIERS.get(match.group(2), 1.0)
+    return -number if negative else number
+
+
+def parse_numeric(values):
+    """Parse a raw metric column into float64, tolerating export formatting.
+
+    Handles thousands separators ("12,345", "1.234.567", "1 234"), decimal
+    commas ("3,4"), K/M/B suffixes ("1.2K", "3,4 M") and percent signs. Plain
+    numbers go through a single ``pd.to_numeric`` pass; only the residue that
+    fails it is cleaned with vectorized string ops, and whatever survives that
+    is parsed row by row.
+
+    Returns ``(array, stats)`` where stats holds ``non_empty``, ``parsed`` and
+    ``coverage`` (parsed / non_empty) for the column.
+    """
+    s = pd.Series(values) if not isinstance(values, pd.Series) else values
+    s = s.reset_index(drop=True)
+
+    blank_count = 0
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        out = s.to_numpy(dtype="float64", na_value=np.nan)
+    else:
+        out = pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64", na_value=np.nan, copy=True)
+        residue = np.isnan(out) & s.notna().to_numpy()
+        if residue.any():
+            raw = s[residue].astype(_STRING_DTYPE)
+            text = raw.str.replace(_STRIP_CHARS_RE, "", regex=True).str.upper()
+            text = text.str.replace("−", "-", regex=False)
+            blank = text.isin(MISSING_TOKENS)
+            blank_count = int(blank.sum())
+            text = text.str.rstrip("%")
+            suffix = text.str[-1].where(text.str[-1].isin(list(SUFFIX_MULTIPLIERS)))
+            num = text.str.slice(0, -1).where(suffix.notna(), text)
+            matched = num.str.fullmatch(_PLAIN_NUMBER_RE).fillna(False).astype(bool) & ~blank
+            if matched.any():
+                num = _normalize_separators(num[matched], suffix[matched].notna())
+                parsed = pd.to_numeric(num, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+                unit = suffix[matched].fillna("").to_numpy(dtype=object)
+                scale = np.select([unit == k for k in SUFFIX_MULTIPLIERS], list(SUFFIX_MULTIPLIERS.values()), 1.0)
+                out[matched.index[matched.to_numpy()]] = parsed * scale
+
+            leftover = np.isnan(out) & residue
+            leftover[blank.index[blank.to_numpy()]] = False
+            if leftover.any():
+                out[leftover] = [_parse_one(v) for v in s[leftover]]
+
+    non_empty = int(s.notna().sum()) - blank_count
+    parsed_count = int((~np.isnan(out)).sum())
+    stats = {
+        "non_empty": non_empty,
+        "parsed": parsed_count,
+        "coverage": round(parsed_count / non_empty, 4) if non_empty else 0.0,
+    }
+    return out, stats
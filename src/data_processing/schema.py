@@ -2,6 +2,12 @@ import pandas as pd
 import numpy as np
 import io
 
+from src.data_processing.dates import DATE_DTYPE, parse_dates
+from src.data_processing.dtypes import apply_dtype_policy
+from src.data_processing.numeric import parse_numeric
+from src.data_processing.validation import validate_frame
+from src.instrumentation import instrument, span
+
 PLATFORM_SIGNATURES = {
     "YouTube": ["video title", "video views", "watch time (hours)", "subscribers gained"],
     "Instagram": ["impressions", "reach", "profile visits", "website clicks"],
@@ -11,13 +17,22 @@ PLATFORM_SIGNATURES = {
 }
 
 STANDARD_COLUMNS = [
-    "platform", "post_id", "date", "title",
+    "platform", "post_id", "author", "date", "title",
     "views", "impressions", "reach",
     "likes", "comments", "shares", "saves",
     "watch_time", "duration",
     "engagement_rate", "authenticity_score", "manipulation_flag"
 ]
 
+METRIC_COLUMNS = [
+    "views", "impressions", "reach",
+    "likes", "comments", "shares", "saves",
+    "watch_time", "duration",
+]
+
+# Identity mapping for records already keyed by standard names
+STANDARD_MAP = {c: [c] for c in ["post_id", "author", "date", "title"] + METRIC_COLUMNS}
+
 COLUMN_MAPS = {
     "YouTube": {
         "views": ["video views", "views"],
@@ -32,6 +47,7 @@ COLUMN_MAPS = {
         "title": ["video title", "content title", "title"],
         "date": ["date", "publish date", "published at"],
         "post_id": ["video id", "content id", "post id"],
+        "author": ["channel", "channel title", "channel name", "author"],
     },
     "Instagram": {
         "views": ["video views", "views", "reach"],
@@ -46,6 +62,7 @@ COLUMN_MAPS = {
         "title": ["description", "caption", "post description"],
         "date": ["date", "publish time", "posted"],
         "post_id": ["post id", "content id", "media id"],
+        "author": ["username", "account", "account username", "author"],
     },
     "TikTok": {
         "views": ["video views", "views"],
@@ -60,6 +77,7 @@ COLUMN_MAPS = {
         "title": ["video title", "caption", "description"],
         "date": ["date", "publish time"],
         "post_id": ["video id", "content id"],
+        "author": ["username", "creator", "author"],
     },
     "LinkedIn": {
         "views": ["impressions", "views"],
@@ -74,6 +92,7 @@ COLUMN_MAPS = {
         "title": ["post title", "content", "title"],
         "date": ["date", "publish date"],
         "post_id": ["post id", "content urn"],
+        "author": ["author", "posted by", "page name"],
     },
     "Twitter": {
         "views": ["impressions", "views"],
@@ -88,19 +107,26 @@ COLUMN_MAPS = {
         "title": ["tweet text", "text", "content"],
         "date": ["time", "date", "created at"],
         "post_id": ["tweet id", "post id", "id"],
+        "author": ["username", "screen name", "user", "author"],
     },
 }
 
 
-def _safe_read(file_bytes):
+@instrument("schema.read_csv")
+def _read_with_encoding(file_bytes):
     for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
         try:
-            return pd.read_csv(io.BytesIO(file_bytes), encoding=enc)
+            return pd.read_csv(io.BytesIO(file_bytes), encoding=enc), enc
         except Exception:
             continue
     raise ValueError("Could not decode CSV.")
 
 
+def _safe_read(file_bytes):
+    return _read_with_encoding(file_bytes)[0]
+
+
+@instrument("schema.detect_platform")
 def _detect_platform(df):
     cols = [c.lower().strip() for c in df.columns]
     best, best_score = "Unknown", 0
@@ -121,26 +147,35 @@ def _find(df, src_cols, candidates, fallback=None):
 def _find_numeric(df, src_cols, candidates):
     for c in candidates:
         if c in src_cols:
-            return pd.to_numeric(df[src_cols[c]], errors="coerce").values
-    return None
+            return parse_numeric(df[src_cols[c]])
+    return None, None
 
 
-def _map_columns(df, platform):
-    col_map = COLUMN_MAPS.get(platform, {})
+@instrument("schema.map_columns")
+def _map_columns(df, platform, col_map=None):
+    col_map = col_map if col_map is not None else COLUMN_MAPS.get(platform, {})
     src_cols = {c.lower().strip(): c for c in df.columns}
-    out = pd.DataFrame()
-    report = {"mapped": {}, "missing": []}
+    out = pd.DataFrame(index=range(len(df)))
+    report = {"mapped": {}, "missing": [], "coverage": {}}
     out["platform"] = platform
     out["post_id"] = _find(df, src_cols, col_map.get("post_id", []), fallback=range(len(df)))
-    out["date"] = _find(df, src_cols, col_map.get("date", []))
+    out["author"] = _find(df, src_cols, col_map.get("author", []), fallback=np.full(len(df), None, dtype=object))
+    raw_dates = _find(df, src_cols, col_map.get("date", []))
+    if raw_dates is not None:
+        out["date"], date_stats = parse_dates(raw_dates)
+        report["date_format"] = date_stats["format"]
+        report["coverage"]["date"] = date_stats["coverage"]
+    else:
+        out["date"] = pd.Series(pd.NaT, index=out.index, dtype=DATE_DTYPE)
     out["title"] = _find(df, src_cols, col_map.get("title", []), fallback="")
-    for metric in ["views", "impressions", "reach", "likes", "comments", "shares", "saves", "watch_time", "duration"]:
+    for metric in METRIC_COLUMNS:
         candidates = col_map.get(metric, [])
-        val = _find_numeric(df, src_cols, candidates)
+        val, stats = _find_numeric(df, src_cols, candidates)
         if val is not None:
             out[metric] = val
             matched = next((c for c in candidates if c in src_cols), "inferred")
             report["mapped"][metric] = matched
+            report["coverage"][metric] = stats["coverage"]
         else:
             out[metric] = np.nan
             report["missing"].append(metric)
@@ -153,7 +188,23 @@ def _map_columns(df, platform):
         out["engagement_rate"] = np.nan
     out["authenticity_score"] = np.nan
     out["manipulation_flag"] = False
-    return out[STANDARD_COLUMNS], report
+    out = out[STANDARD_COLUMNS]
+    compact = apply_dtype_policy(out)
+    report["memory"] = {
+        "bytes_before": int(out.memory_usage(deep=True).sum()),
+        "bytes_after": int(compact.memory_usage(deep=True).sum()),
+    }
+    return compact, report
+
+
+def standardize_records(df, platform="API"):
+    """Standardize posts that already use the standard column names (e.g. JSON records).
+
+    They go through the same parsing as uploads, so metrics are coerced,
+    dates parsed and engagement_rate derived exactly as in training data.
+    """
+    mapped, _ = _map_columns(df, platform, STANDARD_MAP)
+    return mapped
 
 
 def process_upload(file_bytes):
@@ -164,9 +215,56 @@ def process_upload(file_bytes):
     return mapped, platform, report
 
 
+def _select_platform(platform_choice, detected):
+    choice = (platform_choice or "auto-detect").strip().lower()
+    if choice == "auto-detect":
+        return detected
+    for platform in COLUMN_MAPS:
+        if platform.lower() == choice:
+            return platform
+    raise ValueError(f"Unknown platform '{platform_choice}'.")
+
+
+def map_and_validate_csv(file_bytes, platform_choice="auto-detect"):
+    df, encoding = _read_with_encoding(file_bytes)
+    df.columns = [str(c).strip() for c in df.columns]
+    detected = _detect_platform(df)
+    selected = _select_platform(platform_choice, detected)
+    mapped, mapping = _map_columns(df, selected)
+
+    with span("schema.validate", rows=len(mapped)):
+        report = validate_frame(mapped, METRIC_COLUMNS + ["engagement_rate"])
+    report.detected_platform = detected
+    report.selected_platform = selected
+    report.mapped_columns = dict(mapping["mapped"])
+    report.missing_standard_columns = list(mapping["missing"])
+    report.source_columns = list(df.columns)
+    report.parse_coverage = dict(mapping["coverage"])
+
+    report.notes.append(f"Decoded CSV as {encoding}.")
+    if selected != detected:
+        report.notes.append(f"Platform set to {selected} (schema looked like {detected}).")
+    else:
+        report.notes.append(f"Platform detected from column signature: {detected}.")
+    memory = mapping["memory"]
+    report.notes.append(
+        f"Compact dtypes: {memory['bytes_after'] / 2**20:,.1f} MB in memory "
+        f"({memory['bytes_before'] / 2**20:,.1f} MB before)."
+    )
+    if mapping.get("date_format"):
+        report.notes.append(f"Dates parsed with format {mapping['date_format']}.")
+    for col, coverage in mapping["coverage"].items():
+        if coverage < 1.0:
+            report.notes.append(f"{col}: {coverage:.1%} of non-empty values could be parsed.")
+    for check, count in report.impossible_values.items():
+        if count:
+            report.notes.append(f"{count:,} rows have {check}.")
+    return mapped, report
+
+
 def generate_sample_data(platform="YouTube", n=200):
     rng = np.random.default_rng(42)
-    dates = pd.date_range(end="2025-12-31", periods=n, freq="D")
+    dates = pd.date_range(end="2025-12-31", periods=n, freq="D", tz="UTC")
     views = rng.lognormal(mean=10.5, sigma=1.8, size=n).astype(int)
     impressions = (views * rng.uniform(1.2, 2.0, size=n)).astype(int)
     reach = (impressions * rng.uniform(0.6, 0.9, size=n)).astype(int)
@@ -184,9 +282,10 @@ def generate_sample_data(platform="YouTube", n=200):
     manipulation_flag[manip_idx] = True
     like_comment_ratio = likes / np.maximum(comments, 1)
     auth = np.clip(100 - (like_comment_ratio / 10), 20, 100).round(1)
-    return pd.DataFrame({
+    return apply_dtype_policy(pd.DataFrame({
         "platform": platform,
         "post_id": [f"{platform[:2].upper()}{str(i+1).zfill(5)}" for i in range(n)],
+        "author": [f"{platform.lower()}_creator_{k}" for k in rng.integers(1, 21, size=n)],
         "date": dates,
         "title": [f"Post #{i+1} — {platform} Content" for i in range(n)],
         "views": views,
@@ -201,4 +300,4 @@ def generate_sample_data(platform="YouTube", n=200):
         "engagement_rate": engagement_rate,
         "authenticity_score": auth,
         "manipulation_flag": manipulation_flag,
-    })
+    }))
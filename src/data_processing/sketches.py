@@ -0,0 +1,130 @@
+import numpy as np
+from typing import List, Optional, Tuple
+from dataclasses import dataclass
+
+
+@dataclass
+class Moments:
+    """Count, mean and sum of squared deviations, mergeable across chunks.
+
+    Chunks are folded in with Chan et al.'s parallel update, so the result
+    matches a single pass over the concatenated data without holding it.
+    """
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, values) -> 'Moments':
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = float(values.mean())
+            self.merge(Moments(len(values), mean, float(((values - mean) ** 2).sum())))
+        return self
+
+    def merge(self, other: 'Moments') -> 'Moments':
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        return self
+
+    def std(self, ddof: int = 1) -> float:
+        if self.count <= ddof:
+            return float('nan')
+        return float(np.sqrt(self.m2 / (self.count - ddof)))
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch with bounded memory.
+
+    Values land in level 0; whenever a level outgrows its capacity it is
+    sorted and every other item (random offset) of its lower part is
+    promoted to the next level with twice the weight. Capacities shrink
+    geometrically towards the lower levels, so a few k items are kept however
+    many values are seen. Sparing the top of each level from compaction makes
+    high quantiles (p99, p99.9) much more accurate than the median, which is
+    the right trade-off for heavy-tailed engagement counts. Sketches built on
+    separate chunks (or processes) merge into the sketch of the combined data.
+    """
+
+    def __init__(self, k: int = 400, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            capacity = self._capacity(level)
+            if len(items) > capacity:
+                items = np.sort(items)
+                # The largest items are never compacted at this level, which keeps
+                # the upper tail (where spike thresholds live) close to exact; an
+                # odd item out also stays so total weight is preserved.
+                n_compact = (len(items) - capacity // 2) // 2 * 2
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level] = items[n_compact:]
+                promoted = items[:n_compact][self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values) -> 'QuantileSketch':
+        values = np.asarray(values, dtype='float64').ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.count += len(values)
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2.0 ** level) for level, items_ in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Approximate value at quantile(s) q in [0, 1]"""
+        q = np.asarray(q, dtype='float64')
+        if self.count == 0:
+            return np.full(q.shape, np.nan) if q.ndim else float('nan')
+        items, cum = self._weighted()
+        idx = np.searchsorted(cum, q * cum[-1], side='left').clip(0, len(items) - 1)
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, items[idx]))
+        return result if q.ndim else float(result)
+
+    def rank(self, values) -> np.ndarray:
+        """Approximate fraction of seen values <= each of values"""
+        values = np.asarray(values, dtype='float64')
+        if self.count == 0:
+            return np.full(values.shape, np.nan)
+        items, cum = self._weighted()
+        idx = np.searchsorted(items, values, side='right')
+        ranks = np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0.0) / cum[-1]
+        return np.where(np.isnan(values), np.nan, ranks)
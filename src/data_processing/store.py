@@ -0,0 +1,113 @@
+"""Shared on-disk store of standardized datasets.
+
+Each dataset is written once, as an uncompressed Arrow IPC file named after
+its content fingerprint, and opened through a memory map. Numeric and
+string columns of the frames returned by ``open`` point straight into the
+mapped file, so the page cache holds a single copy of the data no matter
+how many sessions (or server processes on the host) have it open. The
+views are read-only; pandas copies a column before writing to it.
+
+Without pyarrow the store is disabled and ``share`` returns its input.
+"""
+import os
+import tempfile
+import threading
+import uuid
+from typing import Optional
+
+import pandas as pd
+
+from src.data_processing.fingerprint import dataset_fingerprint
+
+
+def _has_arrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class DatasetStore:
+    """Directory of memory-mappable datasets, keyed by content fingerprint.
+
+    Files beyond ``max_bytes`` are removed least recently opened first;
+    frames already mapped from a removed file stay valid until they are
+    released.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 4 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = _has_arrow()
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.arrow")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def put(self, df: pd.DataFrame, key: Optional[str] = None) -> str:
+        """Write df unless a dataset with the same content is stored; returns its key"""
+        import pyarrow as pa
+
+        key = key or dataset_fingerprint(df)
+        path = self.path(key)
+        if os.path.exists(path):
+            return key
+        os.makedirs(self.root, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=None)
+        # Concurrent writers each write their own file; the rename is atomic
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._prune(keep=path)
+        return key
+
+    def open(self, key: str) -> pd.DataFrame:
+        """Read-only frame over the memory-mapped dataset"""
+        import pyarrow as pa
+
+        path = self.path(key)
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        os.utime(path)
+        # split_blocks keeps one block per column, so numeric columns without
+        # nulls are wrapped rather than consolidated into a new 2-D array
+        return table.to_pandas(split_blocks=True)
+
+    def share(self, df: pd.DataFrame, key: Optional[str] = None) -> pd.DataFrame:
+        """Store df and return the shared view of it"""
+        if not self.enabled:
+            return df
+        return self.open(self.put(df, key))
+
+    def _prune(self, keep: str) -> None:
+        with self._lock:
+            files = []
+            for name in os.listdir(self.root):
+                if name.endswith(".arrow"):
+                    path = os.path.join(self.root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path != keep:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+
+
+DATASETS = DatasetStore(os.environ.get("SCA_DATA_DIR") or os.path.join(tempfile.gettempdir(), "sca-datasets"))
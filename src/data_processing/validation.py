@@ -0,0 +1,123 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Pairs (part, whole) where part > whole cannot happen in a real export.
+IMPOSSIBLE_PAIRS = [
+    ("likes", "views"),
+    ("comments", "views"),
+    ("reach", "impressions"),
+]
+
+
+@dataclass
+class ColumnStats:
+    column: str
+    non_null: int
+    null_rate: float
+    negative: int = 0
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+
+
+@dataclass
+class ValidationReport:
+    rows: int
+    detected_platform: str = "Unknown"
+    selected_platform: str = "Unknown"
+    mapped_columns: Dict[str, str] = field(default_factory=dict)
+    missing_standard_columns: List[str] = field(default_factory=list)
+    source_columns: List[str] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+    column_stats: Dict[str, ColumnStats] = field(default_factory=dict)
+    parse_coverage: Dict[str, float] = field(default_factory=dict)
+    impossible_values: Dict[str, int] = field(default_factory=dict)
+    duplicate_post_id_rate: float = 0.0
+    duplicate_title_rate: float = 0.0
+
+    def coverage_frame(self) -> pd.DataFrame:
+        """Per-column coverage table, ready for display."""
+        rows = [
+            {
+                "column": s.column,
+                "non_null_rows": s.non_null,
+                "total_rows": self.rows,
+                "coverage_percent": round((1 - s.null_rate) * 100, 2),
+                "negative_values": s.negative,
+                "min": s.min,
+                "max": s.max,
+                "mean": s.mean,
+            }
+            for s in self.column_stats.values()
+        ]
+        return pd.DataFrame(rows)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _duplicate_rate(values: pd.Series) -> float:
+    present = values.dropna()
+    if not pd.api.types.is_numeric_dtype(present):
+        present = present[present.astype(str).str.strip() != ""]
+    if len(present) == 0:
+        return 0.0
+    return round(float(present.duplicated().sum()) / len(present) * 100, 2)
+
+
+def validate_frame(df: pd.DataFrame, metric_columns: List[str]) -> ValidationReport:
+    """Compute coverage, null rates, value sanity and duplicate rates for a standardized frame.
+
+    All metric columns are materialized once as a single float matrix and every
+    statistic is a column-wise reduction over it, so the cost is one pass over
+    the data regardless of how many checks are reported.
+    """
+    n = len(df)
+    report = ValidationReport(rows=n)
+    metrics = [c for c in metric_columns if c in df.columns]
+
+    if metrics:
+        block = df[metrics].to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(block)
+        non_null = present.sum(axis=0)
+        negative = (block < 0).sum(axis=0)
+        any_present = non_null > 0
+        safe = np.where(present, block, 0.0)
+        sums = safe.sum(axis=0)
+        mins = np.where(present, block, np.inf).min(axis=0) if n else np.full(len(metrics), np.inf)
+        maxs = np.where(present, block, -np.inf).max(axis=0) if n else np.full(len(metrics), -np.inf)
+        for i, col in enumerate(metrics):
+            report.column_stats[col] = ColumnStats(
+                column=col,
+                non_null=int(non_null[i]),
+                null_rate=round(float(1 - non_null[i] / n), 4) if n else 1.0,
+                negative=int(negative[i]),
+                min=float(mins[i]) if any_present[i] else None,
+                max=float(maxs[i]) if any_present[i] else None,
+                mean=round(float(sums[i] / non_null[i]), 4) if any_present[i] else None,
+            )
+        position = {c: i for i, c in enumerate(metrics)}
+        for part, whole in IMPOSSIBLE_PAIRS:
+            if part in position and whole in position:
+                report.impossible_values[f"{part} > {whole}"] = int(
+                    (block[:, position[part]] > block[:, position[whole]]).sum()
+                )
+        if "engagement_rate" in position:
+            report.impossible_values["engagement_rate > 100"] = int((block[:, position["engagement_rate"]] > 100).sum())
+
+    for col in df.columns:
+        if col in report.column_stats:
+            continue
+        non_null = int(df[col].notna().sum())
+        report.column_stats[col] = ColumnStats(
+            column=col, non_null=non_null, null_rate=round(1 - non_null / n, 4) if n else 1.0
+        )
+
+    if "post_id" in df.columns:
+        report.duplicate_post_id_rate = _duplicate_rate(df["post_id"])
+    if "title" in df.columns:
+        report.duplicate_title_rate = _duplicate_rate(df["title"])
+    return report
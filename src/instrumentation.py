@@ -0,0 +1,202 @@
+"""Timing and memory spans around the expensive steps of the analysis.
+
+Disabled by default. ``span()`` then returns a shared no-op context manager
+and ``@instrument`` wrappers call straight through after one flag check, so
+leaving the hooks in hot paths costs nanoseconds per call::
+
+    from src import instrumentation
+    instrumentation.enable(memory=True)
+    pipeline.run()
+    print(instrumentation.prometheus_text())
+
+Set ``SCA_PROFILE=1`` (or ``SCA_PROFILE=memory``) to enable it at import.
+
+Totals per span name cover every call; individual records are kept only
+for the last ``MAX_RECORDS`` spans, so a long-running process stays bounded.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger('sca.profile')
+
+_enabled = False
+_memory = False
+_lock = threading.Lock()
+_local = threading.local()
+MAX_RECORDS = 10_000
+_records: Deque['SpanRecord'] = deque(maxlen=MAX_RECORDS)
+_totals: Dict[str, Dict] = {}
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    seconds: float
+    parent: Optional[str] = None
+    depth: int = 0
+    peak_bytes: Optional[int] = None
+    labels: Dict[str, object] = field(default_factory=dict)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **labels) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """One timed region; nested spans record their parent's name and depth."""
+
+    def __init__(self, name: str, labels: Dict[str, object]):
+        self.name = name
+        self.labels = labels
+        self.peak_seen = 0
+
+    def set(self, **labels) -> None:
+        """Attach labels (e.g. rows=...) known only inside the span"""
+        self.labels.update(labels)
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault('stack', [])
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        self.memory = _memory and tracemalloc.is_tracing()
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None and self.parent.memory:
+                self.parent.peak_seen = max(self.parent.peak_seen, peak)
+            # reset_peak is process-wide; the parent keeps what it saw so far in peak_seen
+            tracemalloc.reset_peak()
+            self.start_bytes = current
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        peak_bytes = None
+        if self.memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self.peak_seen)
+            peak_bytes = max(peak - self.start_bytes, 0)
+            if self.parent is not None and self.parent.memory:
+                self.parent.peak_seen = max(self.parent.peak_seen, peak)
+        _local.stack.pop()
+        record = SpanRecord(self.name, seconds, self.parent.name if self.parent else None,
+                            len(_local.stack), peak_bytes, self.labels)
+        with _lock:
+            _records.append(record)
+            totals = _totals.setdefault(self.name, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'peak_bytes': None})
+            totals['count'] += 1
+            totals['seconds'] += seconds
+            totals['max_seconds'] = max(totals['max_seconds'], seconds)
+            if peak_bytes is not None:
+                totals['peak_bytes'] = max(totals['peak_bytes'] or 0, peak_bytes)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(asdict(record), default=str))
+        return False
+
+
+def span(name: str, **labels):
+    """Context manager timing the enclosed block (no-op while disabled)"""
+    if not _enabled:
+        return _NOOP
+    return Span(name, labels)
+
+
+def instrument(name: Optional[str] = None) -> Callable:
+    """Decorator wrapping every call of a function in a span"""
+    def decorate(fn):
+        label = name or f'{fn.__module__}.{fn.__qualname__}'
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable(memory: bool = False) -> None:
+    """Start recording spans; ``memory`` also tracks peak allocations (slower)"""
+    global _enabled, _memory
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled, _memory
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _records.clear()
+        _totals.clear()
+
+
+def records() -> List[SpanRecord]:
+    """The most recent MAX_RECORDS spans, oldest first"""
+    with _lock:
+        return list(_records)
+
+
+def summary() -> Dict[str, Dict]:
+    """Per span name: call count, total/max seconds and max peak bytes, over every call since reset()"""
+    with _lock:
+        return {name: dict(s) for name, s in _totals.items()}
+
+
+def json_lines() -> str:
+    """One JSON object per recent span (see records()), in completion order"""
+    return '\n'.join(json.dumps(asdict(r), default=str) for r in records())
+
+
+def prometheus_text(prefix: str = 'sca') -> str:
+    """Span totals in the Prometheus text exposition format"""
+    stats = summary()
+    lines = [f'# HELP {prefix}_span_seconds Wall time spent in instrumented spans.',
+             f'# TYPE {prefix}_span_seconds summary']
+    for name, s in stats.items():
+        lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {s["seconds"]:.6f}')
+        lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {s["count"]}')
+    lines += [f'# HELP {prefix}_span_seconds_max Slowest single call per span.',
+              f'# TYPE {prefix}_span_seconds_max gauge']
+    lines += [f'{prefix}_span_seconds_max{{span="{name}"}} {s["max_seconds"]:.6f}' for name, s in stats.items()]
+    peaks = {name: s['peak_bytes'] for name, s in stats.items() if s['peak_bytes'] is not None}
+    if peaks:
+        lines += [f'# HELP {prefix}_span_peak_bytes Largest traced allocation peak above the span start.',
+                  f'# TYPE {prefix}_span_peak_bytes gauge']
+        lines += [f'{prefix}_span_peak_bytes{{span="{name}"}} {peak}' for name, peak in peaks.items()]
+    return '\n'.join(lines) + '\n'
+
+
+if os.environ.get('SCA_PROFILE', '').lower() not in ('', '0', 'false'):
+    enable(memory=os.environ['SCA_PROFILE'].lower() == 'memory')
@@ -0,0 +1,128 @@
+import pandas as pd
+import numpy as np
+from typing import Mapping, Optional, Tuple
+from scipy.sparse import coo_matrix, csr_matrix, triu
+from scipy.sparse.csgraph import connected_components
+
+from src.data_processing.dates import ensure_datetime
+from src.instrumentation import instrument
+
+
+class CoordinationDetector:
+    """Find groups of authors whose posts burst together with matching engagement shapes.
+
+    Posts are keyed by (time bucket, like-rate bin, comment-rate bin). A key
+    shared by several distinct authors is a synchronized burst. Author pairs
+    that keep meeting in such bursts are found with a sparse author x burst
+    incidence product (A @ A.T) rather than pairwise loops; pairs whose shared
+    bursts make up most of their activity are merged into coordination groups
+    with connected components.
+    """
+
+    def __init__(self, time_bucket: str = '1h', min_authors: int = 3, max_authors: int = 500,
+                 min_shared_bursts: int = 2, min_overlap: float = 0.5, bins_per_decade: int = 4,
+                 block_authors: int = 4_000):
+        self.time_bucket = time_bucket
+        self.min_authors = min_authors
+        self.max_authors = max_authors
+        self.min_shared_bursts = min_shared_bursts
+        self.min_overlap = min_overlap
+        self.bins_per_decade = bins_per_decade
+        self.block_authors = block_authors
+
+    def _rate_bin(self, numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        rate = np.nan_to_num(numerator, nan=0.0) / (np.nan_to_num(denominator, nan=0.0) + 1)
+        return np.floor(np.log10(rate + 1e-6) * self.bins_per_decade).astype(np.int64)
+
+    def _burst_keys(self, df: pd.DataFrame, metrics: Optional[Mapping[str, np.ndarray]] = None) -> np.ndarray:
+        """Factorized (bucket, fingerprint) key per post; -1 where the date is missing."""
+        dates = ensure_datetime(df['date'])
+        bucket = dates.dt.floor(self.time_bucket)
+
+        def metric(name):
+            if metrics is not None:
+                return metrics[name]
+            if name not in df.columns:
+                return np.zeros(len(df))
+            return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype='float64')
+
+        views, likes, comments = metric('views'), metric('likes'), metric('comments')
+        fingerprint = pd.DataFrame({
+            'bucket': bucket.to_numpy(dtype='datetime64[us]'),
+            'like_bin': self._rate_bin(likes, views),
+            'comment_bin': self._rate_bin(comments, likes),
+        })
+        keys = pd.util.hash_pandas_object(fingerprint, index=False).to_numpy()
+        codes, _ = pd.factorize(keys)
+        codes[bucket.isna().to_numpy()] = -1
+        return codes
+
+    def _strong_pairs(self, incidence: csr_matrix, posts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Author pairs (row < col) that share enough bursts, computed a block of rows
+        at a time so the full author x author product is never held in memory."""
+        transposed = incidence.T.tocsc()
+        rows, cols = [], []
+        for start in range(0, incidence.shape[0], self.block_authors):
+            block = triu(incidence[start:start + self.block_authors] @ transposed, k=1 + start).tocoo()
+            row = block.row + start
+            # Busy accounts meet by chance; require the shared bursts to be a
+            # large share of the quieter account's posting history as well.
+            overlap = block.data / np.minimum(posts[row], posts[block.col])
+            strong = (block.data >= self.min_shared_bursts) & (overlap >= self.min_overlap)
+            rows.append(row[strong])
+            cols.append(block.col[strong])
+        return np.concatenate(rows), np.concatenate(cols)
+
+    @instrument('detector.coordination')
+    def detect(self, df: pd.DataFrame, metrics: Optional[Mapping[str, np.ndarray]] = None) -> pd.DataFrame:
+        """Label each post with its coordination group (-1 if none) and the group's author count.
+
+        ``metrics`` may supply already-coerced float arrays for views, likes
+        and comments (e.g. a shared RuleContext) so they are not parsed again.
+        """
+        n = len(df)
+        out = pd.DataFrame({
+            'coordination_group': np.full(n, -1, dtype=np.int64),
+            'coordination_group_size': np.zeros(n, dtype=np.int64),
+        }, index=df.index)
+        # Without authors (typically a single account's own export) there is
+        # nobody to coordinate with; treating each post as its own actor would
+        # flag any few posts that share an hour and engagement shape.
+        if n == 0 or 'date' not in df.columns or 'author' not in df.columns or not df['author'].notna().any():
+            return out
+
+        burst = self._burst_keys(df, metrics)
+        author, _ = pd.factorize(df['author'])
+        valid = (burst >= 0) & (author >= 0)
+        if not valid.any():
+            return out
+
+        n_authors = int(author.max()) + 1
+        pair = np.unique(burst[valid].astype(np.int64) * n_authors + author[valid])
+        pair_burst, pair_author = pair // n_authors, pair % n_authors
+        authors_per_burst = np.bincount(pair_burst, minlength=int(burst.max()) + 1)
+        synced = (authors_per_burst >= self.min_authors) & (authors_per_burst <= self.max_authors)
+        keep = synced[pair_burst]
+        if not keep.any():
+            return out
+
+        burst_ids, burst_col = np.unique(pair_burst[keep], return_inverse=True)
+        incidence = csr_matrix(
+            (np.ones(int(keep.sum()), dtype=np.int32), (pair_author[keep], burst_col)),
+            shape=(n_authors, len(burst_ids)),
+        )
+        row, col = self._strong_pairs(incidence, np.bincount(author[valid], minlength=n_authors))
+        links = coo_matrix(
+            (np.ones(len(row), dtype=np.int8), (row, col)),
+            shape=(n_authors, n_authors),
+        )
+        linked_authors = np.zeros(n_authors, dtype=bool)
+        linked_authors[row] = True
+        linked_authors[col] = True
+        _, group = connected_components(links, directed=False)
+        group_sizes = np.bincount(group[linked_authors], minlength=group.max() + 1)
+        post_synced = valid & synced[np.maximum(burst, 0)]
+        flagged = post_synced & linked_authors[np.maximum(author, 0)]
+        out.loc[flagged, 'coordination_group'] = group[author[flagged]]
+        out.loc[flagged, 'coordination_group_size'] = group_sizes[group[author[flagged]]]
+        return out
@@ -1,30 +1,31 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_absolute_error, r2_score
-import xgboost as xgb
-from typing import Dict, Tuple, Optional
+from typing import Callable, Dict, Tuple, Optional
+
+from src.data_processing.dates import ensure_datetime
+from src.instrumentation import instrument, span
+from src.models.model_selection import SEARCH_SPACE, build_model, design_matrix, needs_scaling, select_model, take_rows
 
 
 class EngagementPredictor:
     def __init__(self):
         self.models = {}
         self.scalers = {}
+        self.feature_means = {}
         self.feature_names = []
         self.metrics_trained = {}
         
+    @instrument('predictor.features')
     def prepare_features(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, list]:
         """Extract features from standardized schema"""
         features = pd.DataFrame()
         
         # Temporal features
         if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            features['hour'] = df['date'].dt.hour
-            features['day_of_week'] = df['date'].dt.dayofweek
-            features['month'] = df['date'].dt.month
+            dates = ensure_datetime(df['date'])
+            features['hour'] = dates.dt.hour
+            features['day_of_week'] = dates.dt.dayofweek
+            features['month'] = dates.dt.month
             
         # Text features
         if 'title' in df.columns:
@@ -57,8 +58,14 @@ class EngagementPredictor:
         
         return features, list(features.columns)
     
-    def train(self, df: pd.DataFrame, target_metric: str = 'likes') -> Dict:
-        """Train models to predict engagement metric"""
+    def train(self, df: pd.DataFrame, target_metric: str = 'likes',
+              progress: Optional[Callable[[float, str], None]] = None,
+              cv: int = 0, halving: bool = True, n_jobs: int = -1) -> Dict:
+        """Train models to predict engagement metric; progress(fraction, message) is called per model.
+
+        With cv >= 2 the model is picked by k-fold cross-validation over
+        model_selection.SEARCH_SPACE instead of one 80/20 split.
+        """
         features, feature_names = self.prepare_features(df)
         self.feature_names = feature_names
         
@@ -76,25 +83,37 @@ class EngagementPredictor:
         if len(X) < 100:
             return {"error": "Not enough valid data to train (need at least 100 rows)"}
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        if cv >= 2:
+            return self._train_cv(X, y, target_metric, feature_names, cv, halving, n_jobs, progress)
+        
+        # scikit-learn and XGBoost take seconds to import; load them only when training
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.metrics import mean_absolute_error, r2_score
         
-        # Scale features
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
+        # Split data; one float32 matrix serves every model
+        matrix = design_matrix(X)
+        train_idx, test_idx = train_test_split(np.arange(len(matrix)), test_size=0.2, random_state=42)
+        X_train, X_test = take_rows(matrix, train_idx), take_rows(matrix, test_idx)
+        y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
         
         # Train multiple models
-        models = {
-            'Random Forest': RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42),
-            'Gradient Boosting': GradientBoostingRegressor(n_estimators=100, max_depth=5, random_state=42),
-            'XGBoost': xgb.XGBRegressor(n_estimators=100, max_depth=5, random_state=42)
-        }
+        models = {name: build_model(name, grid[0]) for name, grid in SEARCH_SPACE.items()}
+        
+        # Standardize only for models that need it
+        scaler = None
+        if any(needs_scaling(name) for name in models):
+            scaler = StandardScaler().fit(X_train)
+            X_train_scaled, X_test_scaled = scaler.transform(X_train), scaler.transform(X_test)
         
         results = {}
-        for name, model in models.items():
-            model.fit(X_train_scaled, y_train)
-            y_pred = model.predict(X_test_scaled)
+        for i, (name, model) in enumerate(models.items()):
+            if progress is not None:
+                progress(i / len(models), f"Training {name}")
+            scaled = needs_scaling(name)
+            with span(f'predictor.fit.{name}', rows=len(X_train)):
+                model.fit(X_train_scaled if scaled else X_train, y_train)
+            y_pred = model.predict(X_test_scaled if scaled else X_test)
             
             mae = mean_absolute_error(y_test, y_pred)
             r2 = r2_score(y_test, y_pred)
@@ -111,7 +130,8 @@ class EngagementPredictor:
         best_model_name = max(results, key=lambda x: results[x]['r2'])
         
         self.models[target_metric] = results[best_model_name]['model']
-        self.scalers[target_metric] = scaler
+        self.scalers[target_metric] = scaler if needs_scaling(best_model_name) else None
+        self.feature_means[target_metric] = X_train.mean(axis=0, dtype=np.float64)
         self.metrics_trained[target_metric] = True
         
         return {
@@ -123,18 +143,59 @@ class EngagementPredictor:
             'test_size': len(X_test)
         }
     
+    def _train_cv(self, X: pd.DataFrame, y: pd.Series, target_metric: str, feature_names: list,
+                  cv: int, halving: bool, n_jobs: int, progress) -> Dict:
+        """Cross-validated search, then the winning configuration refit on all rows"""
+        from sklearn.preprocessing import StandardScaler
+        
+        selection = select_model(X, y, cv=cv, halving=halving, n_jobs=n_jobs,
+                                 progress=None if progress is None else lambda f, msg: progress(0.9 * f, msg))
+        if progress is not None:
+            progress(0.9, f"Refitting {selection.best_name} on all rows")
+        matrix = design_matrix(X)
+        scaler = StandardScaler().fit(matrix) if needs_scaling(selection.best_name) else None
+        model = build_model(selection.best_name, selection.best_params)
+        with span(f'predictor.fit.{selection.best_name}', rows=len(X)):
+            model.fit(matrix if scaler is None else scaler.transform(matrix), y)
+        
+        # Scores are cross-validated means; only the winner is refit
+        results = {name: {**scores, 'model': model if name == selection.best_name else None}
+                   for name, scores in selection.best_by_model().items()}
+        
+        self.models[target_metric] = model
+        self.scalers[target_metric] = scaler
+        self.feature_means[target_metric] = matrix.mean(axis=0, dtype=np.float64)
+        self.metrics_trained[target_metric] = True
+        
+        return {
+            'target': target_metric,
+            'best_model': selection.best_name,
+            'best_params': selection.best_params,
+            'results': results,
+            'search': selection.report,
+            'feature_names': feature_names,
+            'train_size': len(X),
+            'test_size': 0,
+            'cv': cv,
+        }
+    
+    def model_input(self, features: pd.DataFrame, target_metric: str) -> np.ndarray:
+        """float32 matrix the target's model was trained on: training columns, scaled only if the model needs it"""
+        # Same columns and order as in training, even if df lacks e.g. a date or title
+        X = design_matrix(features.reindex(columns=self.feature_names).fillna(0))
+        scaler = self.scalers[target_metric]
+        return X if scaler is None else scaler.transform(X)
+    
+    @instrument('predictor.predict')
     def predict(self, df: pd.DataFrame, target_metric: str = 'likes') -> pd.DataFrame:
         """Generate predictions for new data"""
         if target_metric not in self.models:
             raise ValueError(f"Model for '{target_metric}' not trained yet")
             
         features, _ = self.prepare_features(df)
-        X = features.fillna(0)
-        X_scaled = self.scalers[target_metric].transform(X)
-        
-        predictions = self.models[target_metric].predict(X_scaled)
+        predictions = self.models[target_metric].predict(self.model_input(features, target_metric))
         
-        result = df.copy()
+        result = df.copy(deep=False)
         result[f'predicted_{target_metric}'] = predictions
         
         return result
@@ -1,147 +1,194 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
-from scipy import stats
+from typing import Dict, List, Optional, Tuple
+
+from src.instrumentation import instrument
+from src.models.rules import RuleContext, RulesEngine
+from src.models.signals import SIGNAL_REGISTRY, signal_count, signal_counts
+
+
+ANOMALY_FEATURES = ['views', 'likes', 'comments', 'shares', 'like_rate', 'comment_rate', 'engagement_rate']
 
 
 class ManipulationDetector:
-    def __init__(self):
-        self.suspicious_threshold = 0.7
-        
-    def detect_all(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
-        """Run all manipulation detection checks"""
-        results = df.copy()
-        
-        # Initialize risk scores
-        results['manipulation_risk_score'] = 0.0
-        results['risk_flags'] = ''
-        
-        flags_summary = {
-            'spike_anomalies': 0,
-            'ratio_anomalies': 0,
-            'velocity_anomalies': 0,
-            'total_flagged': 0
+    def __init__(self, n_estimators: int = 200, max_train_rows: int = 200_000,
+                 batch_size: int = 100_000, n_jobs: int = 1, random_state: int = 42,
+                 rules: Optional[RulesEngine] = None, suspicious_threshold: float = 0.7):
+        self.suspicious_threshold = suspicious_threshold
+        self.rules = rules if rules is not None else RulesEngine()
+        self.last_rule_hits: Dict[str, int] = {}
+        self.last_summary: Dict[str, int] = {}
+        self.n_estimators = n_estimators
+        self.max_train_rows = max_train_rows
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.model = None
+        self.score_reference = None
+        self.feature_medians: Optional[np.ndarray] = None
+        
+    @instrument('detector.anomaly_features')
+    def _anomaly_features(self, df: pd.DataFrame, context: Optional[RuleContext] = None) -> np.ndarray:
+        """Log-scaled counts and engagement ratios for the Isolation Forest (NaN where a metric is missing)"""
+        metric = context if context is not None else RuleContext(df)
+        
+        views, likes, comments = metric['views'], metric['likes'], metric['comments']
+        if 'engagement_rate' in df.columns:
+            engagement_rate = metric['engagement_rate']
+        else:
+            # Same definition as the standardized schema
+            interactions = np.nan_to_num(likes) + np.nan_to_num(comments) + np.nan_to_num(metric['shares'])
+            engagement_rate = interactions / np.where(views == 0, np.nan, views) * 100
+        columns = {
+            'views': np.log1p(np.clip(views, 0, None)),
+            'likes': np.log1p(np.clip(likes, 0, None)),
+            'comments': np.log1p(np.clip(comments, 0, None)),
+            'shares': np.log1p(np.clip(metric['shares'], 0, None)),
+            'like_rate': likes / (views + 1),
+            'comment_rate': comments / (likes + 1),
+            'engagement_rate': engagement_rate,
         }
-        
-        # Run detectors
-        spike_flags = self._detect_engagement_spikes(df)
-        ratio_flags = self._detect_abnormal_ratios(df)
-        velocity_flags = self._detect_velocity_anomalies(df)
-        
-        # Combine flags
-        for idx in df.index:
-            flags = []
-            risk = 0.0
-            
-            if idx in spike_flags:
-                flags.append('SPIKE')
-                risk += 0.3
-                flags_summary['spike_anomalies'] += 1
-                
-            if idx in ratio_flags:
-                flags.append('RATIO')
-                risk += 0.3
-                flags_summary['ratio_anomalies'] += 1
-                
-            if idx in velocity_flags:
-                flags.append('VELOCITY')
-                risk += 0.4
-                flags_summary['velocity_anomalies'] += 1
-            
-            results.loc[idx, 'manipulation_risk_score'] = min(risk, 1.0)
-            results.loc[idx, 'risk_flags'] = ', '.join(flags) if flags else 'Clean'
-        
-        flags_summary['total_flagged'] = (results['manipulation_risk_score'] > self.suspicious_threshold).sum()
-        
-        return results, flags_summary
+        X = np.column_stack([columns[f] for f in ANOMALY_FEATURES])
+        X[~np.isfinite(X)] = np.nan
+        return X
+
+    def _impute(self, X: np.ndarray) -> np.ndarray:
+        """Fill missing features with their training medians, so a missing metric looks typical rather than extreme"""
+        missing = np.isnan(X)
+        if missing.any():
+            X = np.where(missing, self.feature_medians if self.feature_medians is not None else 0.0, X)
+        return X
     
-    def _detect_engagement_spikes(self, df: pd.DataFrame) -> List[int]:
-        """Detect sudden unusual spikes in engagement metrics"""
-        flagged = []
-        
-        for metric in ['views', 'likes', 'comments']:
-            if metric not in df.columns:
-                continue
-                
-            values = pd.to_numeric(df[metric], errors='coerce').fillna(0)
-            
-            if len(values) < 10:
-                continue
-            
-            # Calculate z-scores
-            mean = values.mean()
-            std = values.std()
-            
-            if std == 0:
-                continue
-                
-            z_scores = np.abs((values - mean) / std)
-            
-            # Flag values > 3 standard deviations
-            spike_idx = df.index[z_scores > 3].tolist()
-            flagged.extend(spike_idx)
-        
-        return list(set(flagged))
+    @instrument('detector.isolation_forest.fit')
+    def fit(self, df: pd.DataFrame) -> 'ManipulationDetector':
+        """Train the Isolation Forest on a random subsample of the posts"""
+        if len(df) < 2:
+            raise ValueError("Need at least 2 posts to fit the anomaly model")
+        
+        X = self._anomaly_features(df)
+        rng = np.random.default_rng(self.random_state)
+        if len(X) > self.max_train_rows:
+            X = X[rng.choice(len(X), size=self.max_train_rows, replace=False)]
+        # A feature missing from every training post falls back to 0
+        observed = ~np.isnan(X).all(axis=0)
+        self.feature_medians = np.zeros(X.shape[1])
+        self.feature_medians[observed] = np.nanmedian(X[:, observed], axis=0)
+        X = self._impute(X)
+        
+        from sklearn.ensemble import IsolationForest
+        self.model = IsolationForest(
+            n_estimators=self.n_estimators,
+            max_samples=min(256, len(X)),
+            contamination='auto',
+            n_jobs=self.n_jobs,
+            random_state=self.random_state,
+        ).fit(X)
+        
+        # Training score range used to turn raw scores into a 0-1 risk
+        train_scores = -self.model.score_samples(X)
+        self.score_reference = (float(np.median(train_scores)), float(train_scores.max()))
+        return self
     
-    def _detect_abnormal_ratios(self, df: pd.DataFrame) -> List[int]:
-        """Detect abnormal engagement ratios"""
-        flagged = []
-        
-        # Check like-to-view ratio
-        if 'views' in df.columns and 'likes' in df.columns:
-            views = pd.to_numeric(df['views'], errors='coerce').fillna(1)
-            likes = pd.to_numeric(df['likes'], errors='coerce').fillna(0)
-            
-            like_rate = likes / (views + 1)
-            
-            # Normal like rate: 1-10%
-            # Flag if > 50% (suspiciously high) or < 0.1% with high views
-            high_rate = (like_rate > 0.5) & (views > 1000)
-            low_rate = (like_rate < 0.001) & (views > 10000)
-            
-            flagged.extend(df.index[high_rate | low_rate].tolist())
-        
-        # Check comment-to-like ratio
-        if 'likes' in df.columns and 'comments' in df.columns:
-            likes = pd.to_numeric(df['likes'], errors='coerce').fillna(1)
-            comments = pd.to_numeric(df['comments'], errors='coerce').fillna(0)
-            
-            comment_rate = comments / (likes + 1)
-            
-            # Normal: 0.5-5%
-            # Flag if > 20% (suspiciously high engagement)
-            high_comment = (comment_rate > 0.2) & (likes > 100)
+    def anomaly_scores(self, df: pd.DataFrame, context: Optional[RuleContext] = None) -> np.ndarray:
+        """Isolation Forest anomaly score per post (higher is more anomalous)"""
+        return self._score_features(self._anomaly_features(df, context))
+    
+    @instrument('detector.isolation_forest.score')
+    def _score_features(self, X: np.ndarray) -> np.ndarray:
+        if self.model is None:
+            raise ValueError("Detector not fitted yet")
+        X = self._impute(X)
+        batches = [X[i:i + self.batch_size] for i in range(0, len(X), self.batch_size)]
+        if len(batches) <= 1 or self.n_jobs == 1:
+            scores = [self.model.score_samples(b) for b in batches]
+        else:
+            import joblib
+            scores = joblib.Parallel(n_jobs=self.n_jobs, prefer='threads')(
+                joblib.delayed(self.model.score_samples)(b) for b in batches
+            )
+        return -np.concatenate(scores) if scores else np.empty(0)
+    
+    def predict(self, df: pd.DataFrame, context: Optional[RuleContext] = None) -> pd.DataFrame:
+        """Score posts with rule signals plus the Isolation Forest.
+
+        Pass a RuleContext carrying reference moments/sketches to score a
+        small batch against the statistics of a larger dataset.
+        """
+        return self.predict_many([df], [context])[0]
+    
+    def predict_many(self, frames: List[pd.DataFrame], contexts: Optional[List[Optional[RuleContext]]] = None) -> List[pd.DataFrame]:
+        """predict() for several independent frames with a single Isolation Forest pass.
+
+        Rules (including cross-row ones such as velocity) only see posts of
+        their own frame; the forest scores all frames' rows at once, reusing
+        the metric arrays the rules parsed.
+        """
+        contexts = contexts or [None] * len(frames)
+        contexts = [c if c is not None else RuleContext(df) for df, c in zip(frames, contexts)]
+        parts = [self.detect_all(df, c)[0] for df, c in zip(frames, contexts)]
+        X = np.concatenate([self._anomaly_features(df, c) for df, c in zip(frames, contexts)])
+        anomaly_all = self._score_features(X)
+        
+        median, worst = self.score_reference
+        outputs, start = [], 0
+        for results in parts:
+            anomaly = anomaly_all[start:start + len(results)]
+            start += len(results)
+            anomaly_risk = np.clip((anomaly - median) / max(worst - median, 1e-9), 0, 1)
+            rule_risk = results['manipulation_risk_score'].to_numpy()
+            # decision_function is score_samples - offset_, so outliers are where it is negative
+            is_outlier = -anomaly < self.model.offset_
             
-            flagged.extend(df.index[high_comment].tolist())
+            results['anomaly_score'] = anomaly.round(4)
+            results['signal_count'] = signal_count(results['risk_flags'])
+            results['authenticity_score'] = (100 * (1 - np.maximum(anomaly_risk, rule_risk))).round(1)
+            results['manipulation_flag'] = is_outlier | (rule_risk > self.suspicious_threshold)
+            outputs.append(results)
         
-        return list(set(flagged))
+        return outputs
     
-    def _detect_velocity_anomalies(self, df: pd.DataFrame) -> List[int]:
-        """Detect unusual velocity in engagement growth"""
-        flagged = []
-        
-        if 'date' not in df.columns or 'views' not in df.columns:
-            return flagged
-        
-        df_sorted = df.copy()
-        df_sorted['date'] = pd.to_datetime(df_sorted['date'], errors='coerce')
-        df_sorted = df_sorted.dropna(subset=['date']).sort_values('date')
-        
-        views = pd.to_numeric(df_sorted['views'], errors='coerce').fillna(0)
-        
-        if len(views) < 5:
-            return flagged
-        
-        # Calculate rolling velocity (change rate)
-        velocity = views.diff() / views.shift(1).replace(0, 1)
-        
-        # Flag sudden acceleration > 10x
-        sudden_growth = velocity > 10
-        
-        flagged.extend(df_sorted.index[sudden_growth].tolist())
-        
-        return list(set(flagged))
+    def save(self, path: str) -> None:
+        """Persist the fitted detector"""
+        import joblib
+        joblib.dump(self, path)
     
+    @staticmethod
+    def load(path: str) -> 'ManipulationDetector':
+        """Load a detector saved with save()"""
+        import joblib
+        return joblib.load(path)
+        
+    @instrument('detector.rules')
+    def detect_all(self, df: pd.DataFrame, context: Optional[RuleContext] = None) -> Tuple[pd.DataFrame, Dict]:
+        """Run all manipulation rules in one pass over shared metric columns.
+
+        With n_jobs != 1 the rules run on a process pool, unless the context
+        carries reference statistics (a batch scored against a larger dataset).
+        """
+        if self.n_jobs != 1 and (context is None or (context.moments is None and context.sketches is None
+                                                     and context.previous_views is None)):
+            from src.models.parallel import ParallelRuleExecutor
+            executor = ParallelRuleExecutor(self.rules, n_workers=self.n_jobs if self.n_jobs > 0 else None,
+                                            group_by=context.group_by if context is not None else None)
+            evaluation = executor.evaluate(df, context)
+        else:
+            evaluation = self.rules.evaluate(df, context)
+        self.last_rule_hits = evaluation.rule_hits
+        
+        # Shallow copy: input columns are shared (copy-on-write), only new ones are allocated
+        results = df.copy(deep=False)
+        results['manipulation_risk_score'] = evaluation.risk
+        results['risk_flags'] = evaluation.flags
+        if evaluation.extra_columns is not None:
+            for col in evaluation.extra_columns.columns:
+                results[col] = evaluation.extra_columns[col].to_numpy()
+        
+        flags_summary = {s.summary_key: int(c) for s, c in zip(SIGNAL_REGISTRY.values(), signal_counts(evaluation.flags))}
+        flags_summary['total_flagged'] = int((evaluation.risk > self.suspicious_threshold).sum())
+        self.last_summary = flags_summary
+        
+        return results, flags_summary
+
     def get_risk_distribution(self, results: pd.DataFrame) -> Dict:
         """Get distribution of risk scores"""
         if 'manipulation_risk_score' not in results.columns:
@@ -0,0 +1,106 @@
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from src.data_processing.fingerprint import dataset_fingerprint
+
+
+def _pickled_size(value: object) -> int:
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+@dataclass
+class _Flight:
+    event: threading.Event = field(default_factory=threading.Event)
+    value: object = None
+    error: Optional[BaseException] = None
+
+
+class ModelCache:
+    """Process-wide LRU cache of trained models with single-flight training.
+
+    Entries are keyed by (dataset fingerprint, training config). The first
+    caller for a missing key trains; concurrent callers for the same key
+    block on that run instead of starting their own, and all get the same
+    object back. Least recently used entries are evicted once either
+    ``max_entries`` or ``max_bytes`` is exceeded; an entry's size is
+    ``sizeof(value)``, by default its pickled size.
+    """
+
+    def __init__(self, max_entries: int = 16, max_bytes: int = 512 * 1024 * 1024,
+                 sizeof: Optional[Callable[[object], int]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or _pickled_size
+        self._entries: 'OrderedDict[Hashable, Tuple[object, int]]' = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(size for _, size in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_or_train(self, key: Hashable, train: Callable[[], object]) -> object:
+        """Cached model for key, running train() at most once per key at a time"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = train()
+        except BaseException as e:
+            # Followers see the same error; the next request retries
+            flight.error = e
+            raise
+        else:
+            self._store(key, flight.value)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+        return flight.value
+
+    def _store(self, key: Hashable, value: object) -> None:
+        size = int(self.sizeof(value))
+        with self._lock:
+            self._entries[key] = (value, size)
+            self._entries.move_to_end(key)
+            # The newest entry stays even if it alone exceeds max_bytes
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'entries': len(self._entries), 'bytes': self.nbytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+
+MODEL_CACHE = ModelCache()
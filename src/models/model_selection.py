@@ -0,0 +1,214 @@
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.instrumentation import span
+
+# First configuration of each model is the one hold-out training uses
+SEARCH_SPACE: Dict[str, List[Dict]] = {
+    'Random Forest': [
+        {'n_estimators': 100, 'max_depth': 10},
+        {'n_estimators': 100, 'max_depth': 6},
+        {'n_estimators': 200, 'max_depth': None, 'min_samples_leaf': 3},
+        {'n_estimators': 100, 'max_depth': 10, 'max_features': 0.5},
+    ],
+    'Gradient Boosting': [
+        {'n_estimators': 100, 'max_depth': 5},
+        {'n_estimators': 100, 'max_depth': 3},
+        {'n_estimators': 200, 'max_depth': 3, 'learning_rate': 0.05},
+    ],
+    'XGBoost': [
+        {'n_estimators': 100, 'max_depth': 5},
+        {'n_estimators': 300, 'max_depth': 4, 'learning_rate': 0.05},
+        {'n_estimators': 100, 'max_depth': 8, 'subsample': 0.8},
+    ],
+}
+
+
+# Tree ensembles split on raw values; any other model is standardized first
+SCALE_FREE_MODELS = frozenset({'Random Forest', 'Gradient Boosting', 'XGBoost'})
+
+
+def needs_scaling(name: str) -> bool:
+    return name not in SCALE_FREE_MODELS
+
+
+def design_matrix(X) -> np.ndarray:
+    """Column-major float32 feature matrix.
+
+    The tree models work in float32 internally, and their splitters scan
+    one feature at a time, so they fit fastest on column-major input; it
+    is also the layout of a frame's own block, so this is one copy at most.
+    """
+    values = X.to_numpy(dtype=np.float32) if isinstance(X, pd.DataFrame) else X
+    return np.asfortranarray(values, dtype=np.float32)
+
+
+def take_rows(matrix: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Row subset that stays column-major (plain fancy indexing returns row-major)"""
+    return np.take(matrix.T, rows, axis=1).T
+
+
+def build_model(name: str, params: Dict, n_jobs: Optional[int] = None):
+    """Unfitted regressor for a SEARCH_SPACE entry; n_jobs caps its own threads"""
+    if name == 'Random Forest':
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(random_state=42, n_jobs=n_jobs, **params)
+    if name == 'Gradient Boosting':
+        from sklearn.ensemble import GradientBoostingRegressor
+        return GradientBoostingRegressor(random_state=42, **params)
+    if name == 'XGBoost':
+        import xgboost as xgb
+        return xgb.XGBRegressor(random_state=42, n_jobs=n_jobs, **params)
+    raise ValueError(f"Unknown model '{name}'")
+
+
+class FoldCache:
+    """K-fold splits of one training set, with each fold's float32 matrices built once.
+
+    Training rows of a fold are stored in a fixed random order, so the
+    first n rows are a random subsample; successive-halving rungs slice
+    the same cached matrix instead of re-splitting. Standardized copies
+    are only built for models that need them.
+    """
+
+    def __init__(self, X, y, cv: int = 5, random_state: int = 42):
+        from sklearn.model_selection import KFold
+        self.X = design_matrix(X)
+        self.y = np.asarray(y, dtype='float64')
+        rng = np.random.default_rng(random_state)
+        self.splits = [(rng.permutation(train), test)
+                       for train, test in KFold(cv, shuffle=True, random_state=random_state).split(self.X)]
+        self._folds: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.splits)
+
+    @property
+    def train_rows(self) -> int:
+        """Size of the smallest training fold"""
+        return min(len(train) for train, _ in self.splits)
+
+    def fold(self, i: int, scaled: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """X_train, y_train, X_test, y_test of fold i, standardized on the training rows if scaled"""
+        if (i, scaled) not in self._folds:
+            if scaled:
+                from sklearn.preprocessing import StandardScaler
+                X_train, y_train, X_test, y_test = self.fold(i)
+                scaler = StandardScaler().fit(X_train)
+                self._folds[i, True] = (scaler.transform(X_train), y_train, scaler.transform(X_test), y_test)
+            else:
+                train, test = self.splits[i]
+                self._folds[i, False] = (take_rows(self.X, train), self.y[train], take_rows(self.X, test), self.y[test])
+        return self._folds[i, scaled]
+
+
+def _fit_score(name: str, grid: List[Dict], X_train, y_train, X_test, y_test,
+               n_jobs: Optional[int]) -> List[Tuple[float, float, float]]:
+    """R², MAE and fit seconds of each configuration of one model on one fold"""
+    from sklearn.metrics import mean_absolute_error, r2_score
+    dtrains = {}
+    scores = []
+    for params in grid:
+        model = build_model(name, params, n_jobs)
+        start = time.perf_counter()
+        if name == 'XGBoost':
+            import xgboost as xgb
+            # Configurations with the same max_bin share one quantile sketch of the fold
+            max_bin = params.get('max_bin', 256)
+            if max_bin not in dtrains:
+                dtrains[max_bin] = xgb.QuantileDMatrix(X_train, y_train, max_bin=max_bin, nthread=n_jobs)
+            booster = xgb.train(model.get_xgb_params(), dtrains[max_bin], num_boost_round=model.get_num_boosting_rounds())
+            seconds = time.perf_counter() - start
+            y_pred = booster.inplace_predict(X_test)
+        else:
+            model.fit(X_train, y_train)
+            seconds = time.perf_counter() - start
+            y_pred = model.predict(X_test)
+        scores.append((r2_score(y_test, y_pred), mean_absolute_error(y_test, y_pred), seconds))
+    return scores
+
+
+def halving_schedule(n_configs: int, max_rows: int, factor: int = 3, min_rows: int = 100) -> List[int]:
+    """Training rows per rung: the last rung uses max_rows, each earlier one 1/factor of the next"""
+    rungs = 1
+    while factor ** rungs < n_configs and max_rows // factor ** rungs >= min_rows:
+        rungs += 1
+    return [max_rows // factor ** (rungs - 1 - i) for i in range(rungs)]
+
+
+@dataclass
+class ModelSelection:
+    best_name: str
+    best_params: Dict
+    report: pd.DataFrame
+
+    def best_by_model(self) -> Dict[str, Dict]:
+        """Best configuration of each model at the largest rung it reached"""
+        out = {}
+        for name, rows in self.report.groupby('model', sort=False):
+            top = rows[rows['rows'] == rows['rows'].max()].sort_values('r2', ascending=False).iloc[0]
+            out[name] = {'params': top['params'], 'r2': top['r2'], 'r2_std': top['r2_std'],
+                         'mae': top['mae'], 'rows': int(top['rows'])}
+        return out
+
+
+def select_model(X, y, cv: int = 5, candidates: Optional[Dict[str, List[Dict]]] = None,
+                 halving: bool = True, factor: int = 3, min_rows: int = 100, n_jobs: int = -1,
+                 random_state: int = 42, cache: Optional[FoldCache] = None,
+                 progress: Optional[Callable[[float, str], None]] = None) -> ModelSelection:
+    """k-fold CV over every configuration in candidates, ranked by mean R².
+
+    Each rung runs one task per model and fold, in parallel on n_jobs
+    worker processes (joblib memory-maps the cached fold matrices into
+    them); a task fits all of that model's configurations on one prepared
+    matrix.
+    With halving, each rung trains on factor times more rows than the last
+    and keeps the best 1/factor of the configurations.
+    """
+    from joblib import Parallel, delayed, effective_n_jobs
+    candidates = candidates or SEARCH_SPACE
+    cache = cache or FoldCache(X, y, cv, random_state)
+    configs = [(name, params) for name, grid in candidates.items() for params in grid]
+    if halving:
+        schedule = halving_schedule(len(configs), cache.train_rows, factor, min_rows)
+    else:
+        schedule = [cache.train_rows]
+    # Parallel workers each get one thread, so folds do not oversubscribe the cores
+    inner_jobs = 1 if effective_n_jobs(n_jobs) > 1 else None
+
+    records = []
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for rung, rows in enumerate(schedule):
+            if progress is not None:
+                progress(rung / len(schedule), f"CV rung {rung + 1}/{len(schedule)}: {len(configs)} configurations on {rows:,} rows")
+            grids: Dict[str, List[Dict]] = {}
+            for name, params in configs:
+                grids.setdefault(name, []).append(params)
+            tasks = [(name, i) for name in grids for i in range(len(cache))]
+            with span('predictor.cv.rung', rows=rows, configs=len(configs)):
+                folds = [cache.fold(i, needs_scaling(name)) for name, i in tasks]
+                results = parallel(delayed(_fit_score)(name, grids[name], X_tr[:rows], y_tr[:rows], X_te, y_te, inner_jobs)
+                                   for (name, _), (X_tr, y_tr, X_te, y_te) in zip(tasks, folds))
+            # Per model, one tuple of fold scores for each configuration, in grid order
+            scores = {name: iter(zip(*[r for (n, _), r in zip(tasks, results) if n == name])) for name in grids}
+            ranked = []
+            for c, (name, params) in enumerate(configs):
+                r2, mae, seconds = np.array(next(scores[name])).T
+                records.append({'model': name, 'params': params, 'rung': rung, 'rows': rows,
+                                'r2': r2.mean(), 'r2_std': r2.std(), 'mae': mae.mean(),
+                                'fit_seconds': seconds.sum(), 'promoted': False})
+                ranked.append((r2.mean(), c))
+            if rung < len(schedule) - 1:
+                keep = sorted(ranked, key=lambda s: -s[0])[:max(1, int(np.ceil(len(configs) / factor)))]
+                first = len(records) - len(configs)
+                for _, c in keep:
+                    records[first + c]['promoted'] = True
+                configs = [configs[c] for _, c in keep]
+
+    report = pd.DataFrame(records)
+    final = report[report['rung'] == report['rung'].max()]
+    best = final.loc[final['r2'].idxmax()]
+    return ModelSelection(best['model'], best['params'], report)
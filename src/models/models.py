@@ -0,0 +1,89 @@
+import uuid
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, Optional
+
+from src.models import engagement_predictor
+from src.data_processing.fingerprint import dataset_version
+from src.models.model_cache import MODEL_CACHE, ModelCache
+
+
+class EngagementPredictor:
+    """Single-target engagement model with the fit/predict/score interface the dashboard pages use"""
+
+    def __init__(self, target_metric: str = 'engagement_rate', cv: int = 0):
+        self.target_metric = target_metric
+        self.cv = cv
+        self.predictor = engagement_predictor.EngagementPredictor()
+        self.training: Dict = {}
+        self.version: Optional[str] = None
+
+    def fit(self, df: pd.DataFrame, progress: Optional[Callable[[float, str], None]] = None) -> 'EngagementPredictor':
+        training = self.predictor.train(df, self.target_metric, progress, cv=self.cv)
+        if 'error' in training:
+            raise ValueError(training['error'])
+        # Keep only what the pages read; the per-model predictions are not needed after training
+        self.training = {k: training[k] for k in ('best_model', 'feature_names', 'train_size', 'test_size')}
+        self.training['scores'] = {name: {'mae': r['mae'], 'r2': r['r2']} for name, r in training['results'].items()}
+        if 'search' in training:
+            self.training['search'] = training['search']
+        # Identifies this fit in memoized downstream stages (predictions, explanations)
+        self.version = uuid.uuid4().hex
+        return self
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        column = f'predicted_{self.target_metric}'
+        return self.predictor.predict(df, self.target_metric)[column].to_numpy()
+
+    def score(self, df: pd.DataFrame) -> float:
+        """R² of the predictions against the actual target"""
+        from sklearn.metrics import r2_score
+        actual = pd.to_numeric(df[self.target_metric], errors='coerce').to_numpy()
+        valid = ~np.isnan(actual)
+        return float(r2_score(actual[valid], self.predict(df)[valid]))
+
+    def feature_importance(self) -> pd.DataFrame:
+        return self.predictor.get_feature_importance(self.target_metric).reset_index(drop=True)
+
+
+class Explainer:
+    """Global importance and per-post contributions for a fitted EngagementPredictor.
+
+    A post's contribution for a feature is how much the prediction moves
+    when that feature is replaced by its training mean, all features scored
+    in one batch.
+    """
+
+    def __init__(self, predictor: EngagementPredictor):
+        self.predictor = predictor
+
+    def explain_global(self) -> pd.DataFrame:
+        return self.predictor.feature_importance()
+
+    def explain_row(self, row) -> pd.DataFrame:
+        inner = self.predictor.predictor
+        target = self.predictor.target_metric
+        frame = row.to_frame().T if isinstance(row, pd.Series) else pd.DataFrame([row])
+        features, _ = inner.prepare_features(frame.infer_objects())
+        x = features.reindex(columns=inner.feature_names).fillna(0).to_numpy(dtype=float)[0]
+        baseline = inner.feature_means[target]
+        if not len(x):
+            return pd.DataFrame(columns=['feature', 'value', 'contribution'])
+
+        # Row 0 is the post itself, row i+1 has feature i set to its mean
+        X = np.repeat(x[None, :], len(x) + 1, axis=0)
+        X[np.arange(1, len(x) + 1), np.arange(len(x))] = baseline
+        predictions = inner.models[target].predict(inner.model_input(pd.DataFrame(X, columns=inner.feature_names), target))
+        contribution = predictions[0] - predictions[1:]
+        out = pd.DataFrame({'feature': inner.feature_names, 'value': x, 'contribution': contribution})
+        return out.reindex(out['contribution'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+
+def cached_predictor(df: pd.DataFrame, target_metric: str = 'engagement_rate',
+                     cache: Optional[ModelCache] = None,
+                     progress: Optional[Callable[[float, str], None]] = None, cv: int = 0) -> EngagementPredictor:
+    """Trained predictor for df, shared by every session that asks for the same data, target and selection mode"""
+    cache = cache if cache is not None else MODEL_CACHE
+    # Fingerprinted once per frame object, so reruns on the same session frame skip the hash
+    key = (dataset_version(df), 'EngagementPredictor', target_metric, cv)
+    return cache.get_or_train(key, lambda: EngagementPredictor(target_metric, cv).fit(df, progress))
@@ -0,0 +1,132 @@
+import pandas as pd
+import numpy as np
+from typing import Tuple
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from src.instrumentation import instrument
+
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_SHINGLE_BASE = np.uint64(1_000_000_007)
+_EDGE_CHUNK = 1_000_000
+
+
+class NearDuplicateDetector:
+    """Cluster near-identical captions with MinHash signatures and LSH banding.
+
+    Captions are normalized, split into word shingles and hashed in
+    vectorized batches, so there is no Python loop per caption or per pair. Exact duplicates are collapsed before any
+    hashing, which is what makes copy-paste campaigns cheap to process.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 2,
+                 threshold: float = 0.7, batch_size: int = 50_000, seed: int = 42):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.batch_size = batch_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: (a * x + b) mod 2**64, top 32 bits, a odd.
+        self._a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def normalize(texts: pd.Series) -> pd.Series:
+        """Lowercase, drop punctuation/URLs and collapse whitespace."""
+        s = texts.fillna('').astype(str).str.lower()
+        s = s.str.replace(r'https?://\S+', ' ', regex=True)
+        s = s.str.replace(r'[^\w\s]', ' ', regex=True)
+        return s.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+    def _shingle_hashes(self, texts: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """Hash every k-word shingle of every text; returns (hashes, doc_ids) sorted by doc."""
+        k = self.shingle_size
+        tokens = texts.reset_index(drop=True).str.split(' ').explode()
+        doc_ids = tokens.index.to_numpy()
+        token_hash = pd.util.hash_array(tokens.to_numpy(dtype=object))
+
+        n_windows = max(len(token_hash) - k + 1, 0)
+        h = token_hash[:n_windows].copy()
+        for j in range(1, k):
+            h = h * _SHINGLE_BASE + token_hash[j:j + n_windows]
+        valid = doc_ids[:n_windows] == doc_ids[k - 1:k - 1 + n_windows]
+        hashes, ids = h[valid], doc_ids[:n_windows][valid]
+
+        # Texts shorter than one shingle are hashed whole.
+        short = np.flatnonzero(np.bincount(doc_ids, minlength=len(texts)) < k)
+        if len(short):
+            whole = pd.util.hash_array(texts.iloc[short].to_numpy(dtype=object))
+            hashes, ids = np.concatenate([hashes, whole]), np.concatenate([ids, short])
+            order = np.argsort(ids, kind='stable')
+            hashes, ids = hashes[order], ids[order]
+        return (hashes ^ (hashes >> np.uint64(32))) & _MAX_HASH, ids
+
+    def signatures(self, texts: pd.Series) -> np.ndarray:
+        """MinHash signature matrix (n_texts, num_perm) for already-normalized texts."""
+        sig = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts.iloc[start:start + self.batch_size]
+            hashes, doc_ids = self._shingle_hashes(batch)
+            seg_starts = np.searchsorted(doc_ids, np.arange(len(batch)))
+            for i in range(self.num_perm):
+                permuted = (self._a[i] * hashes + self._b[i]) >> np.uint64(32)
+                sig[start:start + len(batch), i] = np.minimum.reduceat(permuted, seg_starts)
+        return sig
+
+    def _similar_edges(self, sig: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Link each signature to the first member of every LSH bucket it shares,
+        keeping only links whose estimated Jaccard similarity passes the threshold."""
+        n = len(sig)
+        rows = self.num_perm // self.bands
+        order = np.arange(n)
+        seen = np.empty(0, dtype=np.int64)
+        for band in range(self.bands):
+            block = sig[:, band * rows:(band + 1) * rows]
+            key = np.zeros(n, dtype=np.uint64)
+            for j in range(rows):
+                key = key * np.uint64(1_000_003) + block[:, j]
+            codes, _ = pd.factorize(key)
+            # factorize numbers buckets by first appearance, so a bucket's first
+            # member is wherever its code exceeds every code seen before it.
+            is_first = np.r_[True, codes[1:] > np.maximum.accumulate(codes)[:-1]]
+            rep = order[is_first][codes]
+            linked = rep != order
+            pair_key = order[linked] * n + rep[linked]
+            pair_key = pair_key[~np.isin(pair_key, seen)]
+            for chunk in range(0, len(pair_key), _EDGE_CHUNK):
+                part = pair_key[chunk:chunk + _EDGE_CHUNK]
+                similarity = (sig[part // n] == sig[part % n]).mean(axis=1)
+                seen = np.union1d(seen, part[similarity >= self.threshold])
+        return seen // n, seen % n
+
+    @instrument('detector.near_duplicates')
+    def find_clusters(self, texts: pd.Series) -> pd.DataFrame:
+        """Assign every caption a near-duplicate cluster id and cluster size.
+
+        Empty captions are left out (cluster id -1, size 0). Captions with no
+        near-duplicate get their own cluster of size 1.
+        """
+        normalized = self.normalize(texts)
+        codes, uniques = pd.factorize(normalized)
+        uniques = pd.Series(uniques, dtype=object)
+        non_empty = (uniques != '').to_numpy()
+        unique_idx = np.flatnonzero(non_empty)
+
+        labels = np.full(len(uniques), -1, dtype=np.int64)
+        if len(unique_idx):
+            sig = self.signatures(uniques.iloc[unique_idx])
+            src, dst = self._similar_edges(sig)
+            m = len(unique_idx)
+            graph = coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(m, m))
+            _, labels[unique_idx] = connected_components(graph, directed=False)
+
+        post_labels = np.where(codes >= 0, labels[np.maximum(codes, 0)], -1)
+        sizes = np.bincount(post_labels[post_labels >= 0], minlength=labels.max() + 1 if len(labels) else 0)
+        cluster_size = np.where(post_labels >= 0, sizes[np.maximum(post_labels, 0)] if len(sizes) else 0, 0)
+        return pd.DataFrame({
+            'duplicate_cluster_id': post_labels,
+            'duplicate_cluster_size': cluster_size,
+        }, index=texts.index)
@@ -0,0 +1,243 @@
+import os
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+from src.data_processing.dates import ensure_datetime
+from src.models.coordination import CoordinationDetector
+from src.models.near_duplicates import NearDuplicateDetector
+from src.models.rules import (DERIVED_COLUMNS, METRIC_COLUMNS, RuleContext, RuleResult, RulesEngine,
+                              build_sketches, collect_moments)
+from src.models.signals import FLAG_DTYPE
+
+# Derived columns that need every row at once; they run as whole-dataset tasks
+CROSS_ROW_COLUMNS = {
+    'duplicate_cluster_id': 'duplicates',
+    'duplicate_cluster_size': 'duplicates',
+    'coordination_group': 'coordination',
+    'coordination_group_size': 'coordination',
+}
+_NAT = np.iinfo(np.int64).min
+
+
+class SharedColumns:
+    """Named NumPy arrays backed by shared memory blocks.
+
+    Only ``spec`` (block names, dtypes, shapes) is sent to worker processes,
+    which map the same buffers instead of receiving pickled copies.
+    """
+
+    def __init__(self):
+        self.spec: Dict[str, Tuple[str, str, Tuple[int, ...]]] = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def empty(self, name: str, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._blocks.append(block)
+        self.spec[name] = (block.name, dtype.str, tuple(shape))
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def put(self, name: str, values: np.ndarray) -> np.ndarray:
+        view = self.empty(name, values.shape, values.dtype)
+        view[...] = values
+        return view
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+def _attach(spec: Dict) -> Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]:
+    arrays, blocks = {}, []
+    for name, (block_name, dtype, shape) in spec.items():
+        # Pool workers share the parent's resource tracker, which unlinks the
+        # blocks if the parent dies before SharedColumns.close()
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+def _partition_frame(arrays: Dict[str, np.ndarray], rows: np.ndarray, names: List[str],
+                     group_by: Optional[str], group_values: Optional[np.ndarray]) -> pd.DataFrame:
+    columns = {c: arrays[c][rows] for c in names}
+    if 'date' in arrays:
+        columns['date'] = pd.to_datetime(arrays['date'][rows].view('datetime64[us]'), utc=True)
+    if group_by is not None:
+        columns[group_by] = group_values[arrays['group'][rows]]
+    return pd.DataFrame(columns, index=rows)
+
+
+def _stats_task(spec, start, stop, metrics, group_by, group_values, with_sketches, seed):
+    arrays, blocks = _attach(spec)
+    try:
+        df = _partition_frame(arrays, arrays['order'][start:stop].copy(), metrics, group_by, group_values)
+        ctx = RuleContext(df)
+        moments = collect_moments(ctx, metrics, group_by)
+        sketches = build_sketches(ctx, metrics, group_by, seed=seed) if with_sketches else None
+        return moments, sketches
+    finally:
+        # Views into a block must be gone before it can be closed
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+def _score_task(spec, start, stop, rules, columns, group_by, group_values, moments, sketches, cross_columns):
+    arrays, blocks = _attach(spec)
+    try:
+        rows = arrays['order'][start:stop].copy()
+        df = _partition_frame(arrays, rows, columns, group_by, group_values)
+        previous_views = None
+        before = int(arrays['order'][start - 1]) if start > 0 else None
+        if before is not None and 'views' in arrays and 'date' in arrays and arrays['date'][before] != _NAT:
+            previous_views = float(np.nan_to_num(arrays['views'][before], nan=0.0))
+        ctx = RuleContext(df, moments=moments, group_by=group_by, previous_views=previous_views, sketches=sketches)
+        for col in cross_columns:
+            ctx[col] = arrays[col][rows]
+        evaluation = rules.evaluate(df, ctx)
+        arrays['flags'][rows] = evaluation.flags
+        arrays['risk'][rows] = evaluation.risk
+        return evaluation.rule_hits
+    finally:
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+def _cross_row_task(kind: str, frame: pd.DataFrame) -> pd.DataFrame:
+    if kind == 'duplicates':
+        return NearDuplicateDetector().find_clusters(frame['title'])
+    return CoordinationDetector().detect(frame)
+
+
+def _merge_statistics(parts: List[Optional[Dict]]) -> Optional[Dict]:
+    """Merge per-partition {group: {metric: stat}} dicts in partition order"""
+    if not parts or parts[0] is None:
+        return None
+    merged: Dict = {}
+    for part in parts:
+        for group, per_metric in part.items():
+            target = merged.setdefault(group, {})
+            for metric, stat in per_metric.items():
+                if metric in target:
+                    target[metric].merge(stat)
+                else:
+                    target[metric] = stat
+    return merged
+
+
+class ParallelRuleExecutor:
+    """Evaluate a RulesEngine across a process pool over shared-memory columns.
+
+    Metric columns, any other column a rule references, and the date and
+    group columns are copied once into shared memory and
+    rows are split into contiguous partitions in date order, so velocity
+    only needs the previous partition's last view count. Workers first
+    return per-partition moments (and quantile sketches if any rule uses a
+    percentile), which are merged in partition order. Because statistics are
+    global (or per ``group_by`` value) before scoring, partitions can be
+    balanced row ranges rather than groups. Workers then score their rows
+    and write flags and risk straight into shared output buffers, so results
+    are independent of scheduling and identical to a single-process run
+    (percentile ranks come from merged sketches, so they can differ from a
+    single sketch within the sketch's error).
+    Caption and coordination clustering need the whole dataset; they run as
+    single tasks in the same pool, in parallel with the statistics pass.
+    Columns are taken from ``context`` when one is passed, so its float
+    arrays are left parsed for whatever else shares it.
+    """
+
+    def __init__(self, rules: Optional[RulesEngine] = None, n_workers: Optional[int] = None,
+                 group_by: Optional[str] = None, partitions_per_worker: int = 4,
+                 min_partition_rows: int = 25_000):
+        self.rules = rules if rules is not None else RulesEngine()
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.group_by = group_by
+        self.partitions_per_worker = partitions_per_worker
+        self.min_partition_rows = min_partition_rows
+
+    def _bounds(self, n: int) -> List[Tuple[int, int]]:
+        parts = max(1, min(self.n_workers * self.partitions_per_worker, n // self.min_partition_rows))
+        edges = np.linspace(0, n, parts + 1).astype(int)
+        return list(zip(edges[:-1], edges[1:]))
+
+    def evaluate(self, df: pd.DataFrame, context: Optional[RuleContext] = None) -> RuleResult:
+        """Flags, risk and rule hits for every row, in the order of df"""
+        n = len(df)
+        bounds = self._bounds(n)
+        ctx = context if context is not None else RuleContext(df, group_by=self.group_by)
+        if self.n_workers <= 1 or len(bounds) < 2:
+            return self.rules.evaluate(df, ctx)
+
+        metrics = [m for m in METRIC_COLUMNS if m in df.columns]
+        # Raw columns rules read directly; derived ones are rebuilt in the workers
+        columns = list(dict.fromkeys(metrics + [c for c in self.rules.columns if c in df.columns
+                                                and c not in DERIVED_COLUMNS and c not in ('date', self.group_by)]))
+        needed = set(self.rules.columns)
+        with_sketches = any(c.endswith('_pct') for c in needed)
+        cross_kinds = list(dict.fromkeys(CROSS_ROW_COLUMNS[c] for c in self.rules.columns if c in CROSS_ROW_COLUMNS))
+        if 'title' not in df.columns and 'duplicates' in cross_kinds:
+            cross_kinds.remove('duplicates')
+        if 'date' not in df.columns and 'coordination' in cross_kinds:
+            cross_kinds.remove('coordination')
+
+        shared = SharedColumns()
+        try:
+            for c in columns:
+                shared.put(c, ctx[c])
+            if 'date' in df.columns:
+                dates = ensure_datetime(df['date']).to_numpy(dtype='datetime64[us]').view(np.int64)
+                shared.put('date', dates)
+                dated = dates != _NAT
+                order = np.r_[np.flatnonzero(dated)[np.argsort(dates[dated], kind='stable')], np.flatnonzero(~dated)]
+            else:
+                order = np.arange(n)
+            shared.put('order', order.astype(np.int64))
+            group_values = None
+            if self.group_by is not None:
+                codes, group_values = pd.factorize(df[self.group_by], use_na_sentinel=False)
+                shared.put('group', codes.astype(np.int64))
+                group_values = np.asarray(group_values, dtype=object)
+            flags = shared.empty('flags', (n,), FLAG_DTYPE)
+            risk = shared.empty('risk', (n,), np.float64)
+
+            with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+                cross_futures = {}
+                for kind in cross_kinds:
+                    cols = ['title'] if kind == 'duplicates' else [c for c in ['date', 'author', 'views', 'likes', 'comments'] if c in df.columns]
+                    cross_futures[kind] = pool.submit(_cross_row_task, kind, df[cols])
+
+                stats = [pool.submit(_stats_task, shared.spec, start, stop, metrics, self.group_by,
+                                     group_values, with_sketches, i)
+                         for i, (start, stop) in enumerate(bounds)]
+                stats = [f.result() for f in stats]
+                moments = _merge_statistics([m for m, _ in stats])
+                sketches = _merge_statistics([s for _, s in stats])
+
+                frames = [cross_futures[kind].result() for kind in cross_kinds]
+                cross_columns = []
+                for frame in frames:
+                    for col in frame.columns:
+                        shared.put(col, frame[col].to_numpy())
+                        cross_columns.append(col)
+
+                scored = [pool.submit(_score_task, shared.spec, start, stop, self.rules, columns, self.group_by,
+                                      group_values, moments, sketches, cross_columns)
+                          for start, stop in bounds]
+                rule_hits: Dict[str, int] = {}
+                for future in scored:
+                    for name, hits in future.result().items():
+                        rule_hits[name] = rule_hits.get(name, 0) + hits
+
+            result = RuleResult(flags=flags.copy(), risk=risk.copy(), rule_hits=rule_hits,
+                                extra_columns=pd.concat(frames, axis=1) if frames else None)
+        finally:
+            flags = risk = None
+            shared.close()
+        return result
@@ -0,0 +1,365 @@
+import ast
+import json
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from src.data_processing.dates import ensure_datetime
+from src.data_processing.sketches import Moments, QuantileSketch
+from src.instrumentation import instrument
+from src.models.signals import FLAG_DTYPE, SIGNAL_REGISTRY, register_signal, risk_from_flags
+
+METRIC_COLUMNS = ['views', 'impressions', 'reach', 'likes', 'comments', 'shares', 'saves',
+                  'watch_time', 'duration', 'engagement_rate']
+
+
+@dataclass
+class Rule:
+    name: str
+    signal: str
+    expr: str
+    description: str = ''
+
+
+DEFAULT_RULES = [
+    Rule('views_spike', 'SPIKE', 'abs(views_z) > 3', 'Views more than 3 std devs from the mean'),
+    Rule('likes_spike', 'SPIKE', 'abs(likes_z) > 3', 'Likes more than 3 std devs from the mean'),
+    Rule('comments_spike', 'SPIKE', 'abs(comments_z) > 3', 'Comments more than 3 std devs from the mean'),
+    Rule('high_like_rate', 'RATIO', '(like_rate > 0.5) & (views > 1000)', 'Over half of viewers liked'),
+    Rule('low_like_rate', 'RATIO', '(like_rate < 0.001) & (views > 10000)', 'Almost no likes on a widely viewed post'),
+    Rule('high_comment_rate', 'RATIO', '(comment_rate > 0.2) & (likes > 100)', 'Comments out of proportion to likes'),
+    Rule('sudden_growth', 'VELOCITY', 'view_velocity > 10', 'Views jumped over 10x versus the previous post'),
+    Rule('caption_campaign', 'DUPLICATE', 'duplicate_cluster_size >= 3', 'Caption shared by 3+ near-identical posts'),
+    Rule('coordinated_burst', 'COORDINATED', 'coordination_group >= 0', 'Author bursts in sync with a coordinated group'),
+]
+
+# Spike rules on percentile rank instead of mean/std, which heavy-tailed view
+# counts distort; swap them in for the SPIKE rules of DEFAULT_RULES.
+PERCENTILE_SPIKE_RULES = [
+    Rule('views_tail', 'SPIKE', 'views_pct > 0.999', 'Views in the top 0.1% of the distribution'),
+    Rule('likes_tail', 'SPIKE', 'likes_pct > 0.999', 'Likes in the top 0.1% of the distribution'),
+    Rule('comments_tail', 'SPIKE', 'comments_pct > 0.999', 'Comments in the top 0.1% of the distribution'),
+]
+
+
+# ── Column context ─────────────────────────────────────────────────────────
+
+def _filled(ctx: 'RuleContext', name: str, value: float) -> np.ndarray:
+    return np.nan_to_num(ctx[name], nan=value)
+
+
+def _standardize(values: np.ndarray, count: int, mean: float, std: float) -> np.ndarray:
+    if count < 10 or std == 0 or np.isnan(std):
+        return np.zeros(len(values))
+    return (values - mean) / std
+
+
+def group_rows(df: pd.DataFrame, group_by: Optional[str]) -> Dict:
+    """{group value: boolean row mask}; a single None group when ungrouped."""
+    if group_by is None:
+        return {None: np.ones(len(df), dtype=bool)}
+    keys = df[group_by].to_numpy()
+    return {g: keys == g for g in pd.unique(keys)}
+
+
+def collect_moments(ctx: 'RuleContext', metrics: List[str], group_by: Optional[str] = None,
+                    moments: Optional[Dict] = None) -> Dict:
+    """Fold a frame's metrics into {group: {metric: Moments}} (missing counted as 0, as spike rules do)."""
+    moments = {} if moments is None else moments
+    for group, rows in group_rows(ctx.df, group_by).items():
+        per_metric = moments.setdefault(group, {})
+        for metric in metrics:
+            if metric in ctx.df.columns:
+                per_metric.setdefault(metric, Moments()).update(_filled(ctx, metric, 0)[rows])
+    return moments
+
+
+def build_sketches(ctx: 'RuleContext', metrics: List[str], group_by: Optional[str] = None,
+                   sketches: Optional[Dict] = None, seed: Optional[int] = None) -> Dict:
+    """Fold a frame's metrics into {group: {metric: QuantileSketch}} (missing counted as 0)."""
+    sketches = {} if sketches is None else sketches
+    for group, rows in group_rows(ctx.df, group_by).items():
+        per_metric = sketches.setdefault(group, {})
+        for metric in metrics:
+            if metric in ctx.df.columns:
+                per_metric.setdefault(metric, QuantileSketch(seed=seed)).update(_filled(ctx, metric, 0)[rows])
+    return sketches
+
+
+def _percentile(ctx: 'RuleContext', metric: str) -> np.ndarray:
+    """Approximate percentile rank (0-1) of each value within its group's distribution."""
+    if ctx.sketches is None:
+        ctx.sketches = build_sketches(ctx, [m for m in METRIC_COLUMNS if m in ctx.df.columns], ctx.group_by)
+    values = _filled(ctx, metric, 0)
+    pct = np.full(len(values), np.nan)
+    for group, rows in group_rows(ctx.df, ctx.group_by).items():
+        sketch = ctx.sketches.get(group, {}).get(metric)
+        if sketch is not None:
+            pct[rows] = sketch.rank(values[rows])
+    return pct
+
+
+def _zscore(ctx: 'RuleContext', metric: str) -> np.ndarray:
+    """z-score against this frame, or against precomputed (e.g. streamed) moments."""
+    values = _filled(ctx, metric, 0)
+    if ctx.moments is None:
+        std = values.std(ddof=1) if len(values) > 1 else np.nan
+        return _standardize(values, len(values), values.mean() if len(values) else 0.0, std)
+
+    z = np.zeros(len(values))
+    for group, rows in group_rows(ctx.df, ctx.group_by).items():
+        m = ctx.moments.get(group, {}).get(metric)
+        if m is not None:
+            z[rows] = _standardize(values[rows], m.count, m.mean, m.std())
+    return z
+
+
+def _as_float(column: pd.Series) -> np.ndarray:
+    """float64 view of a metric; already-typed float columns are not copied."""
+    if column.dtype == np.float64:
+        return column.to_numpy()
+    return pd.to_numeric(column, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _needs(ctx: 'RuleContext', *names: str) -> bool:
+    return all(n in ctx.df.columns for n in names)
+
+
+def _like_rate(ctx):
+    if not _needs(ctx, 'views', 'likes'):
+        return np.full(ctx.n, np.nan)
+    return _filled(ctx, 'likes', 0) / (_filled(ctx, 'views', 1) + 1)
+
+
+def _comment_rate(ctx):
+    if not _needs(ctx, 'likes', 'comments'):
+        return np.full(ctx.n, np.nan)
+    return _filled(ctx, 'comments', 0) / (_filled(ctx, 'likes', 1) + 1)
+
+
+@instrument('detector.velocity')
+def _view_velocity(ctx):
+    """Growth of views versus the previous post in date order (NaN without a date)."""
+    velocity = np.full(ctx.n, np.nan)
+    if not _needs(ctx, 'date', 'views'):
+        return velocity
+    # Naive UTC datetime64 keeps the sort numeric (tz-aware to_numpy yields objects)
+    dates = ensure_datetime(ctx.df['date']).to_numpy(dtype='datetime64[us]')
+    dated = np.flatnonzero(~np.isnat(dates))
+    if len(dated) < 5 and ctx.previous_views is None:
+        return velocity
+    order = dated[np.argsort(dates[dated], kind='stable')]
+    views = _filled(ctx, 'views', 0)[order]
+    if ctx.previous_views is not None:
+        # Continue the series from the last post of the previous chunk
+        views, order = np.r_[ctx.previous_views, views], np.r_[-1, order]
+    if len(order):
+        ctx.last_views = float(views[-1])
+    previous = np.where(views[:-1] == 0, 1, views[:-1])
+    velocity[order[1:]] = (views[1:] - views[:-1]) / previous
+    return velocity
+
+
+def _duplicate_clusters(ctx, column):
+    if 'title' not in ctx.df.columns or ctx.n == 0:
+        return np.zeros(ctx.n, dtype=np.int64)
+    # Cross-row detectors pull in scipy.sparse; import them only when a rule needs them
+    from src.models.near_duplicates import NearDuplicateDetector
+    return ctx.attach(NearDuplicateDetector().find_clusters(ctx.df['title']))[column].to_numpy()
+
+
+def _coordination_groups(ctx, column):
+    if 'date' not in ctx.df.columns or ctx.n == 0:
+        return np.full(ctx.n, -1, dtype=np.int64)
+    from src.models.coordination import CoordinationDetector
+    return ctx.attach(CoordinationDetector().detect(ctx.df, metrics=ctx))[column].to_numpy()
+
+
+DERIVED_COLUMNS: Dict[str, Callable] = {
+    'like_rate': _like_rate,
+    'comment_rate': _comment_rate,
+    'view_velocity': _view_velocity,
+    'duplicate_cluster_id': lambda ctx: _duplicate_clusters(ctx, 'duplicate_cluster_id'),
+    'duplicate_cluster_size': lambda ctx: _duplicate_clusters(ctx, 'duplicate_cluster_size'),
+    'coordination_group': lambda ctx: _coordination_groups(ctx, 'coordination_group'),
+    'coordination_group_size': lambda ctx: _coordination_groups(ctx, 'coordination_group_size'),
+}
+for _metric in METRIC_COLUMNS:
+    DERIVED_COLUMNS[f'{_metric}_z'] = lambda ctx, m=_metric: _zscore(ctx, m)
+    DERIVED_COLUMNS[f'{_metric}_pct'] = lambda ctx, m=_metric: _percentile(ctx, m)
+
+
+class RuleContext(dict):
+    """Lazily parsed, shared column arrays for one evaluation run.
+
+    Each metric is coerced to float64 once and each derived column is built
+    the first time any rule references it; every later reference, from any
+    rule or detector sharing the context, reuses the cached array.
+
+    ``moments`` ({group: {metric: Moments}}, group None unless ``group_by`` is
+    set) replaces this frame's own mean/std in z-scores, ``sketches`` (same
+    layout, QuantileSketch values) backs the ``{metric}_pct`` percentile
+    columns, and ``previous_views`` continues the velocity series from an
+    earlier chunk; together they let a chunk be scored against statistics of
+    the full dataset.
+    """
+
+    def __init__(self, df: pd.DataFrame, moments: Optional[Dict] = None, group_by: Optional[str] = None,
+                 previous_views: Optional[float] = None, sketches: Optional[Dict] = None):
+        super().__init__()
+        self.df = df
+        self.n = len(df)
+        self.frames: List[pd.DataFrame] = []
+        self.moments = moments
+        self.sketches = sketches
+        self.group_by = group_by
+        self.previous_views = previous_views
+        self.last_views = previous_views
+
+    def attach(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Keep a cross-row detector's output so it can be joined onto the results."""
+        self.frames.append(frame)
+        for col in frame.columns:
+            self[col] = frame[col].to_numpy()
+        return frame
+
+    def __missing__(self, name: str) -> np.ndarray:
+        # eval() looks names up here before its globals, so functions resolve here too
+        if name in RULE_FUNCTIONS:
+            return RULE_FUNCTIONS[name]
+        if name in DERIVED_COLUMNS:
+            values = DERIVED_COLUMNS[name](self)
+        elif name in self.df.columns:
+            values = _as_float(self.df[name])
+        elif name in METRIC_COLUMNS:
+            values = np.full(self.n, np.nan)
+        else:
+            raise NameError(f"Unknown column '{name}' in rule expression")
+        self[name] = values
+        return values
+
+
+# ── Expression compiler ────────────────────────────────────────────────────
+
+RULE_FUNCTIONS = {
+    'abs': np.abs,
+    'log1p': np.log1p,
+    'sqrt': np.sqrt,
+    'isnan': np.isnan,
+    'fillna': lambda x, v: np.nan_to_num(x, nan=v),
+    'minimum': np.minimum,
+    'maximum': np.maximum,
+    'where': np.where,
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load,
+    ast.Constant, ast.BitAnd, ast.BitOr, ast.Invert, ast.Not, ast.USub, ast.UAdd,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod,
+    ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq,
+)
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite and/or/not and chained comparisons into elementwise &, |, ~."""
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        operands = [node.left] + node.comparators
+        parts = [ast.Compare(left=operands[i], ops=[op], comparators=[operands[i + 1]])
+                 for i, op in enumerate(node.ops)]
+        result = parts[0]
+        for part in parts[1:]:
+            result = ast.BinOp(left=result, op=ast.BitAnd(), right=part)
+        return result
+
+
+def compile_expression(expr: str):
+    """Validate a rule expression and compile it to a code object once."""
+    tree = _Vectorize().visit(ast.parse(expr, mode='eval'))
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in rule '{expr}': {type(node).__name__}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in RULE_FUNCTIONS):
+            raise ValueError(f"Unsupported function in rule '{expr}'")
+    ast.fix_missing_locations(tree)
+    return compile(tree, f'<rule: {expr}>', 'eval')
+
+
+@dataclass
+class RuleResult:
+    flags: np.ndarray
+    risk: np.ndarray
+    rule_hits: Dict[str, int]
+    extra_columns: Optional[pd.DataFrame] = None
+
+
+@dataclass
+class RulesEngine:
+    rules: List[Rule] = field(default_factory=lambda: list(DEFAULT_RULES))
+    weights: Dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for signal, weight in self.weights.items():
+            if signal not in SIGNAL_REGISTRY:
+                register_signal(signal, weight)
+        for rule in self.rules:
+            if rule.signal not in SIGNAL_REGISTRY:
+                register_signal(rule.signal, self.weights.get(rule.signal, 0.0))
+        self._compiled = [(rule, compile_expression(rule.expr)) for rule in self.rules]
+        # Column names the rules reference, so callers can prepare only those
+        self.columns = list(dict.fromkeys(node.id for rule in self.rules for node in ast.walk(ast.parse(rule.expr, mode='eval'))
+                                          if isinstance(node, ast.Name) and node.id not in RULE_FUNCTIONS))
+
+    def __getstate__(self):
+        # Code objects don't pickle; workers recompile from the rule text
+        return {'rules': self.rules, 'weights': self.weights}
+
+    def __setstate__(self, state):
+        self.rules, self.weights = state['rules'], state['weights']
+        self.__post_init__()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'RulesEngine':
+        """Build from {'rules': [{name, signal, expr, description?}], 'weights': {signal: w}}"""
+        return cls(rules=[Rule(**r) for r in config.get('rules', [])], weights=dict(config.get('weights', {})))
+
+    @classmethod
+    def from_json(cls, path: str) -> 'RulesEngine':
+        with open(path) as f:
+            return cls.from_config(json.load(f))
+
+    def weight(self, signal: str) -> float:
+        return self.weights.get(signal, SIGNAL_REGISTRY[signal].weight)
+
+    @instrument('rules.evaluate')
+    def evaluate(self, df: pd.DataFrame, context: Optional[RuleContext] = None) -> RuleResult:
+        """Evaluate every rule over shared columns and fold the hits into flags and risk"""
+        ctx = context if context is not None else RuleContext(df)
+        namespace = {'__builtins__': {}}
+        flags = np.zeros(ctx.n, dtype=FLAG_DTYPE)
+        rule_hits = {}
+        for rule, code in self._compiled:
+            hit = np.broadcast_to(np.asarray(eval(code, namespace, ctx), dtype=bool), (ctx.n,))
+            rule_hits[rule.name] = int(hit.sum())
+            flags[hit] |= FLAG_DTYPE(SIGNAL_REGISTRY[rule.signal].mask)
+
+        extra = pd.concat(ctx.frames, axis=1) if ctx.frames else None
+        return RuleResult(flags=flags, risk=risk_from_flags(flags, self.weights), rule_hits=rule_hits, extra_columns=extra)
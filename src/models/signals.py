@@ -0,0 +1,112 @@
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+FLAG_DTYPE = np.uint8
+
+
+@dataclass(frozen=True)
+class Signal:
+    name: str
+    bit: int
+    weight: float
+    summary_key: str
+
+    @property
+    def mask(self) -> int:
+        return 1 << self.bit
+
+
+# Bit positions are part of the stored format; append new signals, never renumber.
+SIGNAL_REGISTRY: Dict[str, Signal] = {
+    s.name: s for s in [
+        Signal('SPIKE', 0, 0.3, 'spike_anomalies'),
+        Signal('RATIO', 1, 0.3, 'ratio_anomalies'),
+        Signal('VELOCITY', 2, 0.4, 'velocity_anomalies'),
+        Signal('DUPLICATE', 3, 0.3, 'duplicate_anomalies'),
+        Signal('COORDINATED', 4, 0.4, 'coordination_anomalies'),
+    ]
+}
+
+
+def register_signal(name: str, weight: float, summary_key: str = None) -> Signal:
+    """Append a signal on the next free bit (used by configurable rules)"""
+    if name in SIGNAL_REGISTRY:
+        return SIGNAL_REGISTRY[name]
+    bit = max(s.bit for s in SIGNAL_REGISTRY.values()) + 1
+    if bit >= np.iinfo(FLAG_DTYPE).bits:
+        raise ValueError(f"No free flag bit left for signal '{name}'")
+    signal = Signal(name, bit, weight, summary_key or f'{name.lower()}_anomalies')
+    SIGNAL_REGISTRY[name] = signal
+    return signal
+
+
+def mask_for(names: Union[str, Iterable[str]]) -> int:
+    """Combined bitmask for one or more signal names"""
+    if isinstance(names, str):
+        names = [names]
+    mask = 0
+    for name in names:
+        if name not in SIGNAL_REGISTRY:
+            raise KeyError(f"Unknown signal '{name}'")
+        mask |= SIGNAL_REGISTRY[name].mask
+    return mask
+
+
+def _as_array(flags) -> np.ndarray:
+    return np.asarray(flags, dtype=FLAG_DTYPE)
+
+
+def has_signal(flags, names: Union[str, Iterable[str]], require_all: bool = False) -> np.ndarray:
+    """Boolean mask of rows carrying any (or all) of the given signals"""
+    mask = FLAG_DTYPE(mask_for(names))
+    hits = _as_array(flags) & mask
+    return hits == mask if require_all else hits != 0
+
+
+def signal_count(flags) -> np.ndarray:
+    """Number of signals set per row"""
+    bits = np.unpackbits(_as_array(flags)[:, None], axis=1)
+    return bits.sum(axis=1).astype(np.int64)
+
+
+def signal_counts(flags) -> pd.Series:
+    """Rows carrying each signal, in registry order"""
+    arr = _as_array(flags)
+    return pd.Series(
+        {s.name: int(np.count_nonzero(arr & FLAG_DTYPE(s.mask))) for s in SIGNAL_REGISTRY.values()},
+        name='count',
+    )
+
+
+def risk_from_flags(flags, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Sum of signal weights per row, capped at 1.0.
+
+    ``weights`` overrides registry weights by signal name. Weights are added
+    in registry order, so the float sum is the same in every process.
+    """
+    arr = _as_array(flags)
+    weights = weights or {}
+    risk = np.zeros(len(arr))
+    for s in SIGNAL_REGISTRY.values():
+        risk += np.where(arr & FLAG_DTYPE(s.mask), weights.get(s.name, s.weight), 0.0)
+    return np.minimum(risk, 1.0)
+
+
+def decode_flags(flags, clean_label: str = 'Clean') -> pd.Series:
+    """Human-readable 'SPIKE, RATIO' labels.
+
+    Only the distinct masks present are decoded (at most 2**n_signals), then
+    broadcast back to rows, so decoding is vectorized over the result set.
+    """
+    arr = _as_array(flags)
+    uniques, inverse = np.unique(arr, return_inverse=True)
+    labels = np.array([', '.join(signal_names(int(m))) or clean_label for m in uniques], dtype=object)
+    index = flags.index if isinstance(flags, pd.Series) else None
+    return pd.Series(labels[inverse.reshape(-1)], index=index, name='risk_flags')
+
+
+def signal_names(mask: int) -> List[str]:
+    """Signal names set in a single mask"""
+    return [s.name for s in SIGNAL_REGISTRY.values() if mask & s.mask]
@@ -0,0 +1,139 @@
+import os
+import pandas as pd
+from typing import Dict, Iterator, List, Optional
+
+from src.models.rules import METRIC_COLUMNS, RuleContext, RulesEngine, build_sketches, collect_moments
+from src.models.signals import SIGNAL_REGISTRY, signal_counts
+
+
+def iter_chunks(path: str, chunksize: int = 250_000, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield a standardized CSV or Parquet file in chunks, with a running row index."""
+    if path.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet requires pyarrow (pip install pyarrow)") from e
+        start = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns)
+
+
+class _ChunkWriter:
+    """Append result chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.lower().endswith(('.parquet', '.pq'))
+        self._writer = None
+        self.started = False
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode='a' if self.started else 'w', header=not self.started, index=False)
+        self.started = True
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+class StreamingDetector:
+    """Two-pass manipulation detection for files larger than memory.
+
+    Pass one reads the file chunk by chunk and folds each metric into
+    mergeable moments and quantile sketches (optionally per ``group_by``
+    value, e.g. platform).
+    Pass two re-reads it, scores every chunk with the same rules engine as
+    ManipulationDetector but against the dataset-wide moments, and appends
+    flagged rows to the output file. Memory is bounded by ``chunksize``.
+
+    Velocity continues across chunk boundaries in file order, so it matches
+    the in-memory result when the file is sorted by date. Caption and
+    coordination rules only see posts within the same chunk.
+    """
+
+    def __init__(self, rules: Optional[RulesEngine] = None, chunksize: int = 250_000,
+                 group_by: Optional[str] = None, suspicious_threshold: float = 0.7):
+        self.rules = rules if rules is not None else RulesEngine()
+        self.chunksize = chunksize
+        self.group_by = group_by
+        self.suspicious_threshold = suspicious_threshold
+        self.moments: Optional[Dict] = None
+        self.sketches: Optional[Dict] = None
+
+    @property
+    def metrics(self) -> List[str]:
+        """Metrics whose z-score or percentile a rule references; only these need file-wide statistics"""
+        needed = set(self.rules.columns)
+        return [m for m in METRIC_COLUMNS if f'{m}_z' in needed or f'{m}_pct' in needed]
+
+    def collect_statistics(self, path: str) -> Dict:
+        """Pass one: {group: {metric: Moments}} over the whole file (sketches kept alongside)"""
+        moments: Dict = {}
+        sketches: Dict = {}
+        metrics = self.metrics
+        for chunk in iter_chunks(path, self.chunksize):
+            ctx = RuleContext(chunk)
+            collect_moments(ctx, metrics, self.group_by, moments)
+            build_sketches(ctx, metrics, self.group_by, sketches)
+        self.moments = moments
+        self.sketches = sketches
+        return moments
+
+    def score_chunks(self, path: str) -> Iterator[pd.DataFrame]:
+        """Pass two: yield every chunk with risk score and flags added"""
+        if self.moments is None:
+            self.collect_statistics(path)
+        previous_views = None
+        for chunk in iter_chunks(path, self.chunksize):
+            ctx = RuleContext(chunk, moments=self.moments, group_by=self.group_by,
+                              previous_views=previous_views, sketches=self.sketches)
+            evaluation = self.rules.evaluate(chunk, ctx)
+            previous_views = ctx.last_views
+            results = chunk.copy(deep=False)
+            results['manipulation_risk_score'] = evaluation.risk
+            results['risk_flags'] = evaluation.flags
+            if evaluation.extra_columns is not None:
+                for col in evaluation.extra_columns.columns:
+                    results[col] = evaluation.extra_columns[col].to_numpy()
+            yield results
+
+    def run(self, path: str, output_path: str, flagged_only: bool = True) -> Dict:
+        """Score a file end to end and write (flagged) rows to CSV or Parquet"""
+        if os.path.abspath(path) == os.path.abspath(output_path):
+            raise ValueError("Output path must differ from the input path")
+
+        self.collect_statistics(path)
+        writer = _ChunkWriter(output_path)
+        counts = pd.Series(0, index=list(SIGNAL_REGISTRY), dtype='int64')
+        rows = written = total_flagged = 0
+        try:
+            for results in self.score_chunks(path):
+                rows += len(results)
+                counts = counts.add(signal_counts(results['risk_flags']), fill_value=0).astype('int64')
+                total_flagged += int((results['manipulation_risk_score'] > self.suspicious_threshold).sum())
+                if flagged_only:
+                    results = results[results['risk_flags'].to_numpy() != 0]
+                if len(results) or not writer.started:
+                    writer.write(results)
+                    written += len(results)
+        finally:
+            writer.close()
+
+        summary = {SIGNAL_REGISTRY[name].summary_key: int(c) for name, c in counts.items()}
+        summary.update({'rows': rows, 'rows_written': written, 'total_flagged': total_flagged})
+        return summary
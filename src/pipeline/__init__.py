@@ -0,0 +1,3 @@
+from src.pipeline.pipeline import AnalysisPipeline, STAGES
+
+__all__ = ["AnalysisPipeline", "STAGES"]
@@ -0,0 +1,83 @@
+"""Run the analysis pipeline from the command line.
+
+    python -m src.pipeline posts.csv -o results.parquet
+    python -m src.pipeline posts.csv --stages standardize,detect --rules rules.json
+    python -m src.pipeline posts.csv --profile spans.prom --profile-memory
+    python -m src.pipeline posts.csv --stages standardize,predict --cv 5
+"""
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from src import instrumentation
+from src.models.manipulation_detector import ManipulationDetector
+from src.models.rules import RulesEngine
+from src.pipeline.pipeline import STAGES, AnalysisPipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.pipeline",
+                                     description="Standardize, predict, explain and detect without the dashboard.")
+    parser.add_argument("input", help="Platform CSV export")
+    parser.add_argument("-o", "--output", help="Results file (.parquet, or .csv)")
+    parser.add_argument("--platform", default="auto-detect", help="Force a platform instead of detecting it")
+    parser.add_argument("--target", default="engagement_rate", help="Metric the engagement model predicts")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument("--cv", type=int, default=0, help="Pick the engagement model by k-fold CV and a hyperparameter search (0 = one 80/20 split)")
+    parser.add_argument("--no-halving", action="store_true", help="With --cv, score every configuration on all rows instead of successive halving")
+    parser.add_argument("--rules", help="JSON rules config for the manipulation detector")
+    parser.add_argument("--n-jobs", type=int, default=1, help="Worker processes for detection (-1 = all cores)")
+    parser.add_argument("--summary", help="Also write timings and summaries to this JSON file")
+    parser.add_argument("--profile", help="Write per-step spans to this file (Prometheus text, or JSON lines for .jsonl)")
+    parser.add_argument("--profile-memory", action="store_true", help="Also trace peak memory per span (slower)")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        instrumentation.enable(memory=args.profile_memory)
+
+    rules = RulesEngine.from_json(args.rules) if args.rules else None
+    pipeline = AnalysisPipeline(args.input, platform=args.platform, target_metric=args.target,
+                                detector=ManipulationDetector(n_jobs=args.n_jobs, rules=rules),
+                                cv=args.cv, halving=not args.no_halving)
+    pipeline.run([s.strip() for s in args.stages.split(",") if s.strip()])
+
+    summary = {"rows": len(pipeline.standardized), "timings": pipeline.timings}
+    if pipeline.validation is not None:
+        summary["platform"] = pipeline.validation.selected_platform
+        summary["notes"] = pipeline.validation.notes
+    if "predict" in pipeline.timings:
+        training = pipeline.training
+        summary["training"] = {"error": training["error"]} if "error" in training else {
+            "best_model": training["best_model"],
+            "r2": round(float(training["results"][training["best_model"]]["r2"]), 4),
+        }
+        if "search" in training:
+            summary["training"]["best_params"] = training["best_params"]
+            summary["search"] = training["search"].round(4).to_dict(orient="records")
+    if "detect" in pipeline.timings:
+        summary["detection"] = pipeline.detection_summary
+
+    print(pipeline.timing_frame().to_string())
+    if "search" in summary:
+        print(pd.DataFrame(summary["search"]).to_string())
+    print(json.dumps({k: v for k, v in summary.items() if k not in ("timings", "search")}, indent=2, default=str))
+    if args.output:
+        pipeline.save(args.output)
+        print(f"Wrote {args.output}")
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(summary, f, indent=2, default=str)
+    if args.profile:
+        with open(args.profile, "w") as f:
+            f.write(instrumentation.json_lines() if args.profile.endswith(".jsonl") else instrumentation.prometheus_text())
+        print(f"Wrote {args.profile}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
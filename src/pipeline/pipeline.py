@@ -0,0 +1,146 @@
+import time
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from src.data_processing.schema import map_and_validate_csv
+from src.data_processing.validation import ValidationReport
+from src.models.engagement_predictor import EngagementPredictor
+from src.models.manipulation_detector import ManipulationDetector
+
+STAGES = ['standardize', 'predict', 'explain', 'detect']
+
+
+class AnalysisPipeline:
+    """Upload → Standardize → Predict → Explain → Detect, without Streamlit.
+
+    Each stage runs on first access and its output is cached on the
+    pipeline, so asking for detection does not re-read the CSV and asking
+    twice does not retrain. Wall time per stage is kept in ``timings``.
+
+    ``source`` is a CSV path, raw CSV bytes, or an already standardized
+    DataFrame (which skips parsing and validation). With ``cv`` >= 2 the
+    engagement model is chosen by cross-validated search (see
+    EngagementPredictor.train).
+    """
+
+    def __init__(self, source: Union[str, bytes, pd.DataFrame], platform: str = 'auto-detect',
+                 target_metric: str = 'engagement_rate', detector: Optional[ManipulationDetector] = None,
+                 predictor: Optional[EngagementPredictor] = None, cv: int = 0, halving: bool = True):
+        self.source = source
+        self.platform = platform
+        self.target_metric = target_metric
+        self.cv = cv
+        self.halving = halving
+        self.detector = detector if detector is not None else ManipulationDetector()
+        self.predictor = predictor if predictor is not None else EngagementPredictor()
+        self.timings: Dict[str, Dict] = {}
+        self._cache: Dict[str, object] = {}
+
+    def _stage(self, name: str, fn: Callable[[], Tuple[object, int]]):
+        if name not in self._cache:
+            start = time.perf_counter()
+            value, rows = fn()
+            self.timings[name] = {'seconds': round(time.perf_counter() - start, 4), 'rows': rows}
+            self._cache[name] = value
+        return self._cache[name]
+
+    # ── Stages ─────────────────────────────────────────────────────────────
+
+    def _standardize(self):
+        if isinstance(self.source, pd.DataFrame):
+            return (self.source, None), len(self.source)
+        data = self.source
+        if isinstance(data, str):
+            with open(data, 'rb') as f:
+                data = f.read()
+        mapped, report = map_and_validate_csv(data, self.platform)
+        return (mapped, report), len(mapped)
+
+    @property
+    def standardized(self) -> pd.DataFrame:
+        return self._stage('standardize', self._standardize)[0]
+
+    @property
+    def validation(self) -> Optional[ValidationReport]:
+        return self._stage('standardize', self._standardize)[1]
+
+    def _predict(self):
+        df = self.standardized
+        training = self.predictor.train(df, self.target_metric, cv=self.cv, halving=self.halving)
+        if 'error' in training:
+            return (None, training), len(df)
+        column = f'predicted_{self.target_metric}'
+        predictions = self.predictor.predict(df, self.target_metric)[column]
+        return (predictions, training), len(df)
+
+    @property
+    def predictions(self) -> Optional[pd.Series]:
+        """Predicted target per post, or None if the model could not be trained"""
+        return self._stage('predict', self._predict)[0]
+
+    @property
+    def training(self) -> Dict:
+        return self._stage('predict', self._predict)[1]
+
+    def _explain(self):
+        self.predictions  # explanation needs the trained model
+        importance = self.predictor.get_feature_importance(self.target_metric)
+        return importance, len(importance)
+
+    @property
+    def explanation(self) -> pd.DataFrame:
+        """Feature importance of the trained engagement model"""
+        return self._stage('explain', self._explain)
+
+    def _detect(self):
+        df = self.standardized
+        if len(df) < 2:
+            results, summary = self.detector.detect_all(df)
+        else:
+            results = self.detector.fit(df).predict(df)
+            summary = dict(self.detector.last_summary)
+            summary['manipulation_flagged'] = int(results['manipulation_flag'].sum())
+        return (results, summary), len(df)
+
+    @property
+    def detection(self) -> pd.DataFrame:
+        return self._stage('detect', self._detect)[0]
+
+    @property
+    def detection_summary(self) -> Dict:
+        return self._stage('detect', self._detect)[1]
+
+    # ── Running and output ─────────────────────────────────────────────────
+
+    def run(self, stages: Optional[List[str]] = None) -> 'AnalysisPipeline':
+        """Force the given stages (default all) to run now"""
+        for stage in stages or STAGES:
+            if stage not in STAGES:
+                raise ValueError(f"Unknown stage '{stage}'. Choose from {', '.join(STAGES)}")
+            {'standardize': lambda: self.standardized, 'predict': lambda: self.predictions,
+             'explain': lambda: self.explanation, 'detect': lambda: self.detection}[stage]()
+        return self
+
+    def results(self) -> pd.DataFrame:
+        """Standardized posts plus whatever prediction and detection columns have been computed"""
+        if 'detect' in self._cache:
+            out = self.detection.copy(deep=False)
+        else:
+            out = self.standardized.copy(deep=False)
+        if 'predict' in self._cache and self.predictions is not None:
+            out[f'predicted_{self.target_metric}'] = self.predictions.to_numpy()
+        return out
+
+    def save(self, path: str) -> str:
+        """Write results() to Parquet (or CSV if the path ends in .csv)"""
+        out = self.results()
+        if path.lower().endswith('.csv'):
+            out.to_csv(path, index=False)
+        else:
+            out.to_parquet(path, index=False)
+        return path
+
+    def timing_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame.from_dict(self.timings, orient='index')
+        frame.index.name = 'stage'
+        return frame
@@ -0,0 +1,3 @@
+from src.service.server import LatencyStats, MicroBatcher, ScoringService
+
+__all__ = ['LatencyStats', 'MicroBatcher', 'ScoringService']
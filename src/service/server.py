@@ -0,0 +1,298 @@
+import asyncio
+import json
+import time
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from src.data_processing.schema import map_and_validate_csv, standardize_records
+from src.data_processing.sketches import QuantileSketch
+from src.models.engagement_predictor import EngagementPredictor
+from src.models.manipulation_detector import ManipulationDetector
+from src.models.rules import METRIC_COLUMNS, RuleContext, build_sketches, collect_moments
+from src.models.signals import decode_flags
+
+MAX_BODY_BYTES = 50 * 1024 * 1024
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyStats:
+    """Request count, errors and latency percentiles per endpoint."""
+
+    def __init__(self):
+        self.endpoints: Dict[str, Dict] = {}
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True) -> None:
+        stats = self.endpoints.setdefault(endpoint, {'count': 0, 'errors': 0, 'sketch': QuantileSketch(k=200, seed=0)})
+        stats['count'] += 1
+        stats['errors'] += 0 if ok else 1
+        stats['sketch'].update([seconds * 1000])
+
+    def snapshot(self) -> Dict:
+        out = {}
+        for endpoint, stats in self.endpoints.items():
+            p50, p90, p99 = stats['sketch'].quantile([0.5, 0.9, 0.99])
+            out[endpoint] = {'count': stats['count'], 'errors': stats['errors'],
+                             'p50_ms': round(p50, 3), 'p90_ms': round(p90, 3), 'p99_ms': round(p99, 3),
+                             'max_ms': round(stats['sketch'].max, 3)}
+        return out
+
+
+class MicroBatcher:
+    """Coalesce concurrent scoring requests into one model call.
+
+    Requests queue their frame and wait on a future. A single consumer
+    drains the queue until ``max_batch_rows`` rows are waiting or
+    ``max_wait_ms`` has passed since the first one, then runs ``fn`` once on
+    the list of waiting frames in a worker thread (keeping the event loop
+    free). ``fn`` returns one result per frame, so it decides what can be
+    pooled: row-wise models concatenate, cross-row rules stay per request.
+    """
+
+    def __init__(self, fn: Callable[[List[pd.DataFrame]], List[pd.DataFrame]], executor: ThreadPoolExecutor,
+                 max_batch_rows: int = 2048, max_wait_ms: float = 5.0):
+        self.fn = fn
+        self.executor = executor
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.rows = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def submit(self, frame: pd.DataFrame) -> pd.DataFrame:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((frame, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            rows = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                rows += len(item[0])
+
+            frames = [frame for frame, _ in pending]
+            try:
+                results = await loop.run_in_executor(self.executor, self.fn, frames)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += rows
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class ScoringService:
+    """Loaded engagement and manipulation models behind async, micro-batched scoring calls.
+
+    Small batches are scored against reference statistics (moments and
+    quantile sketches) taken from the training data, so a request with three
+    posts is not z-scored against itself.
+    """
+
+    def __init__(self, predictor: Optional[EngagementPredictor] = None, detector: Optional[ManipulationDetector] = None,
+                 target_metric: str = 'engagement_rate', reference: Optional[pd.DataFrame] = None,
+                 max_batch_rows: int = 2048, max_wait_ms: float = 5.0):
+        self.predictor = predictor
+        self.detector = detector
+        self.target_metric = target_metric
+        self.moments = self.sketches = None
+        if reference is not None:
+            ctx = RuleContext(reference)
+            metrics = [m for m in METRIC_COLUMNS if m in reference.columns]
+            self.moments = collect_moments(ctx, metrics)
+            self.sketches = build_sketches(ctx, metrics, seed=0)
+        self.latency = LatencyStats()
+        # One model thread: scikit-learn estimators are not shared across threads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scoring')
+        self.batchers = {
+            'predict': MicroBatcher(self._predict_batch, self._executor, max_batch_rows, max_wait_ms),
+            'detect': MicroBatcher(self._detect_batch, self._executor, max_batch_rows, max_wait_ms),
+        }
+        self.handlers = {'/standardize': self.standardize, '/predict': self.predict, '/detect': self.detect}
+
+    @classmethod
+    def from_training_data(cls, df: pd.DataFrame, target_metric: str = 'engagement_rate', **kwargs) -> 'ScoringService':
+        """Train both models on a standardized frame and keep it as the scoring reference"""
+        predictor = EngagementPredictor()
+        training = predictor.train(df, target_metric)
+        if 'error' in training:
+            predictor = None
+        detector = ManipulationDetector().fit(df)
+        return cls(predictor, detector, target_metric, reference=df, **kwargs)
+
+    def _predict_batch(self, frames: List[pd.DataFrame]) -> List[pd.Series]:
+        column = f'predicted_{self.target_metric}'
+        predicted = self.predictor.predict(pd.concat(frames, ignore_index=True), self.target_metric)[column]
+        bounds = np.cumsum([0] + [len(f) for f in frames])
+        return [predicted.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def _detect_batch(self, frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        contexts = [RuleContext(f, moments=self.moments, sketches=self.sketches) for f in frames]
+        outputs = []
+        for results in self.detector.predict_many(frames, contexts):
+            out = results[['manipulation_risk_score', 'anomaly_score', 'authenticity_score', 'manipulation_flag']].copy()
+            out['signals'] = decode_flags(results['risk_flags'], clean_label='').to_numpy()
+            outputs.append(out)
+        return outputs
+
+    # ── Endpoints ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _posts(body: bytes) -> pd.DataFrame:
+        try:
+            payload = json.loads(body or b'{}')
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f"Invalid JSON: {e}")
+        posts = payload.get('posts') if isinstance(payload, dict) else payload
+        if not isinstance(posts, list) or not posts or not all(isinstance(p, dict) for p in posts):
+            raise HTTPError(400, "Body must be {\"posts\": [{...}, ...]} with at least one post")
+        # Same mapping as uploads, so engagement_rate and the other derived fields match training data
+        frame = standardize_records(pd.DataFrame(posts))
+        missing = np.flatnonzero(frame['views'].isna().to_numpy())
+        if len(missing):
+            raise HTTPError(400, f"Every post needs a numeric 'views' value (missing in post {int(missing[0])})")
+        return frame
+
+    async def standardize(self, body: bytes, query: Dict) -> Dict:
+        loop = asyncio.get_running_loop()
+        platform = query.get('platform', 'auto-detect')
+        try:
+            mapped, report = await loop.run_in_executor(None, map_and_validate_csv, body, platform)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return {'platform': report.selected_platform, 'report': report.to_dict(),
+                'posts': json.loads(mapped.to_json(orient='records', date_format='iso'))}
+
+    async def predict(self, body: bytes, query: Dict) -> Dict:
+        if self.predictor is None:
+            raise HTTPError(503, "No engagement model loaded")
+        result = await self.batchers['predict'].submit(self._posts(body))
+        return {'target': self.target_metric, 'predictions': result.round(4).tolist()}
+
+    async def detect(self, body: bytes, query: Dict) -> Dict:
+        if self.detector is None or self.detector.model is None:
+            raise HTTPError(503, "No fitted manipulation detector loaded")
+        result = await self.batchers['detect'].submit(self._posts(body))
+        return {'results': json.loads(result.to_json(orient='records'))}
+
+    def metrics(self) -> Dict:
+        return {
+            'endpoints': self.latency.snapshot(),
+            'batching': {name: {'batches': b.batches, 'rows': b.rows,
+                                'mean_batch_rows': round(b.rows / b.batches, 2) if b.batches else 0.0}
+                         for name, b in self.batchers.items()},
+        }
+
+    # ── HTTP ───────────────────────────────────────────────────────────────
+
+    async def _route(self, method: str, path: str, query: Dict, body: bytes) -> Dict:
+        routes = {
+            ('GET', '/health'): lambda: {'status': 'ok', 'predictor': self.predictor is not None,
+                                         'detector': self.detector is not None},
+            ('GET', '/metrics'): self.metrics,
+        }
+        if (method, path) in routes:
+            return routes[(method, path)]()
+        handlers = self.handlers
+        if path not in handlers and path not in ('/health', '/metrics'):
+            raise HTTPError(404, f"No endpoint {path}")
+        if method != 'POST' or path not in handlers:
+            raise HTTPError(405, f"{method} not allowed on {path}")
+        return await handlers[path](body, query)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection (keep-alive aware)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                keep_alive = True
+                status, payload, path = 200, None, '?'
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY_BYTES:
+                        raise HTTPError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b''
+                    path, _, qs = target.partition('?')
+                    query = dict(p.partition('=')[::2] for p in qs.split('&') if p)
+                    payload = await self._route(method.upper(), path, query, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except ValueError as e:
+                    status, payload, keep_alive = 400, {'error': f"Malformed request: {e}"}, False
+                except Exception as e:
+                    status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+                data = json.dumps(payload, default=str).encode()
+                head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                        f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode() + data)
+                await writer.drain()
+                # Anything but a scoring endpoint shares one key, so clients cannot grow /metrics
+                if path != '/metrics':
+                    self.latency.record(path if path in self.handlers else 'other', time.perf_counter() - start,
+                                        ok=status < 500)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765, ready: Optional[asyncio.Event] = None) -> None:
+        for batcher in self.batchers.values():
+            batcher.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for batcher in self.batchers.values():
+                await batcher.stop()